@@ -13,7 +13,21 @@ from dataclasses import dataclass
 from typing import List, Tuple, Optional
 import sys
 import glob
+import hashlib
 import json
+import logging
+import mmap
+import functools
+import math
+import shutil
+import subprocess
+import tempfile
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Per-frame and per-cue diagnostics; one-off status messages stay on print
+log = logging.getLogger(__name__)
 
 # Japanese text processing libraries
 try:
@@ -28,12 +42,89 @@ try:
 except ImportError:
     FUGASHI_AVAILABLE = False
 
+# Optional JIT for the per-frame blend kernel
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# CJK unified ideograph range treated as kanji
+KANJI_FIRST = 0x4e00
+KANJI_LAST = 0x9faf
+
+
+def kanji_mask(text: str) -> np.ndarray:
+    """Vectorized kanji test over a whole string, one bool per character"""
+    codepoints = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    return (codepoints >= KANJI_FIRST) & (codepoints <= KANJI_LAST)
+
+
+# One SRT cue: index line, timestamp line, then consecutive non-blank text lines.
+# A stray \r counts as whitespace, so CRLF files match without normalizing first.
+_SRT_BLOCK_PATTERN = (
+    r'^[^\n]*\n'
+    r'(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}),(\d{3})[^\n]*\n'
+    r'((?:[^\n]*\S[^\n]*(?:\n|\Z))+)'
+)
+_SRT_BLOCK_RE = re.compile(_SRT_BLOCK_PATTERN, re.MULTILINE)
+_SRT_BLOCK_BYTES_RE = re.compile(_SRT_BLOCK_PATTERN.encode('ascii'), re.MULTILINE)
+
+
+# Side of the square alpha tiles used to skip transparent and copy opaque areas
+BLEND_TILE = 32
+
+
+def _blend_premultiplied_kernel(frame, bgr, premultiplied, inv_alpha, tiles, x, y):
+    """frame[roi] = (t + (t >> 8)) >> 8 with t = frame[roi] * (255 - a) + premultiplied
+    
+    Only the listed tiles are touched; opaque tiles are a straight copy of bgr.
+    """
+    height, width = premultiplied.shape[0], premultiplied.shape[1]
+    for k in prange(tiles.shape[0]):
+        top, left, opaque = tiles[k, 0], tiles[k, 1], tiles[k, 2]
+        for i in range(top, min(top + BLEND_TILE, height)):
+            for j in range(left, min(left + BLEND_TILE, width)):
+                if opaque:
+                    for c in range(3):
+                        frame[y + i, x + j, c] = bgr[i, j, c]
+                else:
+                    inv = inv_alpha[i, j, 0]
+                    for c in range(3):
+                        t = frame[y + i, x + j, c] * inv + premultiplied[i, j, c]
+                        frame[y + i, x + j, c] = (t + (t >> 8)) >> 8
+
+
+if NUMBA_AVAILABLE:
+    # Explicit signature: compiled (or loaded from cache) once at import, no
+    # per-call type dispatch. Overlay planes are always C-contiguous; frames
+    # may be any view.
+    _blend_premultiplied_kernel = njit(
+        'void(uint8[:, :, :], uint8[:, :, ::1], uint16[:, :, ::1], uint16[:, :, ::1], '
+        'int32[:, ::1], int64, int64)',
+        parallel=True, fastmath=True, cache=True, boundscheck=False
+    )(_blend_premultiplied_kernel)
+
+
+def _crop_to_coverage(image: np.ndarray, x: int, y: int) -> Tuple[np.ndarray, int, int]:
+    """Trim fully transparent borders off an RGBA image, shifting its (x, y) position"""
+    coverage = image[:, :, 3]
+    rows = np.flatnonzero(coverage.any(axis=1))
+    cols = np.flatnonzero(coverage.any(axis=0))
+    if rows.size:
+        image = image[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+        x, y = x + int(cols[0]), y + int(rows[0])
+    return image, x, y
+
 
 @dataclass
 class SubtitleSegment:
     start_time: float
     end_time: float
     text: str
+    furigana: Optional['FuriganaLine'] = None
+    overlay: Optional['SubtitleOverlay'] = None
 
 
 @dataclass
@@ -43,6 +134,142 @@ class FuriganaChar:
     is_kanji: bool
 
 
+@dataclass
+class FuriganaLine:
+    """Structure-of-arrays form of a furigana line used by the renderer"""
+    chars: List[str]
+    furigana: List[Optional[str]]
+    is_kanji: np.ndarray  # bool per character
+    
+    @classmethod
+    def from_chars(cls, furigana_chars: List[FuriganaChar]) -> 'FuriganaLine':
+        return cls(
+            [char_info.char for char_info in furigana_chars],
+            [char_info.furigana for char_info in furigana_chars],
+            np.array([char_info.is_kanji for char_info in furigana_chars], dtype=bool)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.chars)
+
+
+@dataclass
+class TextLayout:
+    """Per-character column metrics shared by measurement and rendering"""
+    columns: List[Tuple[int, int, int]]  # (char_width, char_height, furigana_width)
+    width: int
+    height: int
+
+
+@dataclass
+class SubtitleOverlay:
+    """Pre-rendered subtitle with its uint16 blend terms precomputed"""
+    bgr: np.ndarray            # uint8 (h, w, 3)
+    alpha: np.ndarray          # uint8 (h, w, 1)
+    x: int
+    y: int
+    premultiplied: np.ndarray  # bgr * alpha + 128, uint16 (h, w, 3)
+    inv_alpha: np.ndarray      # 255 - alpha, uint16 (h, w, 1); (h, w, 3) for the cv2 path
+    tiles: np.ndarray          # int32 (n, 3): top, left, opaque of each non-empty tile
+    bands: List[Tuple[int, int, int, int]]  # (top, bottom, left, right) per tile row
+    
+    @classmethod
+    def from_rgba(cls, image: np.ndarray, x: int, y: int) -> 'SubtitleOverlay':
+        # Crop the transparent padding around the glyphs once, here
+        image, x, y = _crop_to_coverage(image, x, y)
+        
+        bgr = np.ascontiguousarray(image[:, :, 2::-1])
+        alpha = np.ascontiguousarray(image[:, :, 3:4])
+        alpha_u16 = alpha.astype(np.uint16)
+        premultiplied = bgr * alpha_u16
+        premultiplied += 128
+        inv_alpha = 255 - alpha_u16
+        if not NUMBA_AVAILABLE:
+            # cv2 arithmetic does not broadcast, so only its path pays for 3 channels
+            inv_alpha = np.repeat(inv_alpha, 3, axis=2)
+        tiles, bands = cls._classify_tiles(alpha[:, :, 0])
+        return cls(bgr, alpha, x, y, premultiplied, inv_alpha, tiles, bands)
+    
+    @staticmethod
+    def _classify_tiles(alpha: np.ndarray):
+        """Find the tiles with any coverage and mark the fully opaque ones"""
+        height, width = alpha.shape
+        rows, cols = -(-height // BLEND_TILE), -(-width // BLEND_TILE)
+        
+        # Zero padding keeps edge tiles out of the opaque fast path
+        padded = np.zeros((rows * BLEND_TILE, cols * BLEND_TILE), dtype=np.uint8)
+        padded[:height, :width] = alpha
+        blocks = padded.reshape(rows, BLEND_TILE, cols, BLEND_TILE)
+        block_max = blocks.max(axis=(1, 3))
+        block_min = blocks.min(axis=(1, 3))
+        
+        tile_rows, tile_cols = np.nonzero(block_max)
+        tiles = np.stack([
+            tile_rows * BLEND_TILE, tile_cols * BLEND_TILE, block_min[tile_rows, tile_cols] == 255
+        ], axis=1).astype(np.int32).reshape(-1, 3)
+        
+        bands = []
+        for row in np.unique(tile_rows):
+            band_cols = tile_cols[tile_rows == row]
+            bands.append((
+                int(row) * BLEND_TILE, min((int(row) + 1) * BLEND_TILE, height),
+                int(band_cols.min()) * BLEND_TILE, min((int(band_cols.max()) + 1) * BLEND_TILE, width)
+            ))
+        return tiles, bands
+    
+    def to_bgra(self) -> np.ndarray:
+        return np.concatenate((self.bgr, self.alpha), axis=2)
+    
+    def fits(self, frame_shape: Tuple[int, ...]) -> bool:
+        """Check the overlay lies fully inside a frame of the given shape"""
+        height, width = self.bgr.shape[:2]
+        return (self.x >= 0 and self.y >= 0 and 
+                self.x + width <= frame_shape[1] and self.y + height <= frame_shape[0])
+
+
+def _blend_overlay(frame: np.ndarray, overlay: SubtitleOverlay):
+    """Blend overlay into frame in place; bounds are checked once via overlay.fits"""
+    height, width = overlay.bgr.shape[:2]
+    x, y = overlay.x, overlay.y
+    overlay_region = frame[y:y+height, x:x+width]
+    
+    # Integer blend in uint16 of t = roi * (255 - a) + bgr * a, rounded to
+    # t / 255; premultiplied carries a +128 bias for the shift-based divide
+    if NUMBA_AVAILABLE:
+        _blend_premultiplied_kernel(frame, overlay.bgr, overlay.premultiplied, 
+                                    overlay.inv_alpha, overlay.tiles, x, y)
+        return
+    
+    # OpenCV's SIMD-dispatched arithmetic, restricted to the covered span of each tile row
+    for top, bottom, left, right in overlay.bands:
+        region = overlay_region[top:bottom, left:right]
+        blended = cv2.multiply(region, overlay.inv_alpha[top:bottom, left:right], dtype=cv2.CV_16U)
+        cv2.add(blended, overlay.premultiplied[top:bottom, left:right], dst=blended)
+        region[:] = cv2.convertScaleAbs(blended, alpha=1 / 255.0, beta=-128 / 255.0)
+
+
+@functools.lru_cache(maxsize=1)
+def _fugashi_tagger():
+    """Load the fugashi tagger (and its unidic dictionary) once per process"""
+    return fugashi.Tagger()
+
+
+@functools.lru_cache(maxsize=1)
+def _kakasi_converter():
+    """Create the pykakasi converter once per process, old API as fallback"""
+    try:
+        converter = pykakasi.kakasi()
+        print("✅ Using pykakasi (new API) for furigana generation")
+        return converter
+    except Exception as e:
+        print(f"⚠️  Pykakasi new API failed: {e}")
+        kks = pykakasi.kakasi()
+        kks.setMode('J', 'H')  # Kanji to Hiragana
+        converter = kks.getConverter()
+        print("✅ Using pykakasi (old API) for furigana generation")
+        return converter
+
+
 class EnhancedFuriganaGenerator:
     """Enhanced furigana generator with comprehensive kanji mapping"""
     
@@ -53,7 +280,7 @@ class EnhancedFuriganaGenerator:
         # Try fugashi first
         if FUGASHI_AVAILABLE:
             try:
-                self.tagger = fugashi.Tagger()
+                self.tagger = _fugashi_tagger()
                 print("✅ Using fugashi for furigana generation")
             except Exception as e:
                 print(f"⚠️  Fugashi failed: {e}")
@@ -61,47 +288,48 @@ class EnhancedFuriganaGenerator:
         # Try pykakasi as fallback  
         if not self.tagger and KAKASI_AVAILABLE:
             try:
-                # Try new API first
-                self.kakasi = pykakasi.kakasi()
-                print("✅ Using pykakasi (new API) for furigana generation")
+                self.kakasi = _kakasi_converter()
             except Exception as e:
-                print(f"⚠️  Pykakasi new API failed: {e}")
-                # Try old API
-                try:
-                    kks = pykakasi.kakasi()
-                    kks.setMode('J', 'H')  # Kanji to Hiragana
-                    self.kakasi = kks.getConverter()
-                    print("✅ Using pykakasi (old API) for furigana generation")
-                except Exception as e2:
-                    print(f"⚠️  Pykakasi old API failed: {e2}")
+                print(f"⚠️  Pykakasi old API failed: {e}")
         
         if not self.tagger and not self.kakasi:
             print("⚠️  Using enhanced fallback furigana generation")
         
         # Enhanced kanji dictionary based on your subtitle content
         self.kanji_readings = self._load_kanji_readings()
+        self._reading_table = self._build_reading_table(self.kanji_readings)
+        
+        # Furigana results keyed by raw text (subtitle text repeats every frame)
+        self._furigana_cache = {}
+        self._line_cache = {}
+        
+        # Classify kanji for a whole string in one C-level scan
+        self._kanji_re = re.compile(r'[\u4e00-\u9faf]')
+        
+        # Katakana (ァ-ヶ) to hiragana translation table
+        self._kata_table = str.maketrans({chr(c): chr(c - 0x60) for c in range(0x30a1, 0x30f7)})
     
     def _load_kanji_readings(self) -> dict:
         """Load comprehensive kanji to reading mappings"""
         return {
             # From your subtitle content
             '今': 'いま', '日': 'ひ', '空': 'そら', '気': 'き', '持': 'も',
-            '晴': 'は', '朝': 'あさ', '時': 'じ', '間': 'かん', '静': 'しず',
+            '晴': 'は', '朝': 'あさ', '静': 'しず',
             '心': 'こころ', '落': 'お', '着': 'つ', '深': 'ふか', '呼': 'こ',
             '吸': 'きゅう', '外': 'そと', '鳥': 'とり', '声': 'こえ', '聞': 'き',
             '温': 'あたた', '入': 'い', '笑': 'わら', '穏': 'おだ',
             
             # Additional common kanji
             '人': 'ひと', '大': 'おお', '小': 'ちい', '中': 'なか', '出': 'で',
-            '来': 'き', '行': 'い', '見': 'み', '話': 'はな', '食': 'た',
+            '来': 'き', '行': 'い', '見': 'み', '食': 'た',
             '飲': 'の', '読': 'よ', '書': 'か', '買': 'か', '売': 'う',
             '作': 'つく', '使': 'つか', '思': 'おも', '言': 'い', '考': 'かんが',
-            '知': 'し', '分': 'わ', '手': 'て', '足': 'あし', '目': 'め',
+            '知': 'し', '手': 'て', '足': 'あし', '目': 'め',
             '耳': 'みみ', '口': 'くち', '頭': 'あたま', '体': 'からだ', '水': 'みず',
             '火': 'ひ', '土': 'つち', '木': 'き', '金': 'きん', '石': 'いし',
             '山': 'やま', '川': 'かわ', '海': 'うみ', '田': 'た', '花': 'はな',
             '雨': 'あめ', '雪': 'ゆき', '風': 'かぜ', '雲': 'くも', '星': 'ほし',
-            '月': 'つき', '太': 'たい', '陽': 'よう', '光': 'ひかり', '電': 'でん',
+            '太': 'たい', '陽': 'よう', '光': 'ひかり',
             '車': 'くるま', '電': 'でん', '話': 'わ', '計': 'けい', '時': 'とき',
             '分': 'ふん', '秒': 'びょう', '年': 'とし', '月': 'がつ', '週': 'しゅう',
             '毎': 'まい', '全': 'ぜん', '半': 'はん', '少': 'すこ', '多': 'おお',
@@ -110,14 +338,43 @@ class EnhancedFuriganaGenerator:
             '良': 'よ', '悪': 'わる', '正': 'ただ', '間': 'ま', '違': 'ちが'
         }
     
+    def _build_reading_table(self, readings: dict) -> List[Optional[str]]:
+        """Index fallback readings by codepoint offset in the CJK block"""
+        table = [None] * (KANJI_LAST - KANJI_FIRST + 1)
+        for kanji, reading in readings.items():
+            table[ord(kanji) - KANJI_FIRST] = reading
+        return table
+    
+    def _fallback_reading(self, char: str) -> Optional[str]:
+        """Dictionary reading for a kanji, or None"""
+        offset = ord(char) - KANJI_FIRST
+        if 0 <= offset <= KANJI_LAST - KANJI_FIRST:
+            return self._reading_table[offset]
+        return None
+    
     def generate_furigana(self, text: str) -> List[FuriganaChar]:
-        """Generate furigana using the best available method"""
+        """Generate furigana using the best available method (memoized by text)"""
+        cached = self._furigana_cache.get(text)
+        if cached is not None:
+            return cached
+        
         if self.tagger:
-            return self._generate_with_fugashi(text)
+            result = self._generate_with_fugashi(text)
         elif self.kakasi:
-            return self._generate_with_enhanced_kakasi(text)
+            result = self._generate_with_enhanced_kakasi(text)
         else:
-            return self._generate_enhanced_fallback(text)
+            result = self._generate_enhanced_fallback(text)
+        
+        self._furigana_cache[text] = result
+        return result
+    
+    def generate_furigana_line(self, text: str) -> FuriganaLine:
+        """Generate furigana as parallel arrays for rendering (memoized by text)"""
+        line = self._line_cache.get(text)
+        if line is None:
+            line = FuriganaLine.from_chars(self.generate_furigana(text))
+            self._line_cache[text] = line
+        return line
     
     def _generate_with_fugashi(self, text: str) -> List[FuriganaChar]:
         """Generate furigana using fugashi"""
@@ -136,7 +393,7 @@ class EnhancedFuriganaGenerator:
                 else:
                     for char in word.surface:
                         is_kanji = self._is_kanji(char)
-                        fallback_reading = self.kanji_readings.get(char) if is_kanji else None
+                        fallback_reading = self._fallback_reading(char) if is_kanji else None
                         result.append(FuriganaChar(char, fallback_reading, is_kanji))
         except Exception as e:
             print(f"Fugashi error: {e}")
@@ -167,7 +424,7 @@ class EnhancedFuriganaGenerator:
         enhanced_result = []
         for char_info in result:
             if char_info.is_kanji and not char_info.furigana:
-                fallback_reading = self.kanji_readings.get(char_info.char)
+                fallback_reading = self._fallback_reading(char_info.char)
                 enhanced_result.append(FuriganaChar(char_info.char, fallback_reading, True))
             else:
                 enhanced_result.append(char_info)
@@ -184,26 +441,28 @@ class EnhancedFuriganaGenerator:
                     orig = item.get('orig', '')
                     hira = item.get('hira', item.get('hiragana', ''))
                     
-                    for char in orig:
-                        is_kanji = self._is_kanji(char)
+                    # Kanji positions and per-kanji reading length are fixed per item
+                    kanji_positions = [match.start() for match in self._kanji_re.finditer(orig)]
+                    kanji_index = {pos: idx for idx, pos in enumerate(kanji_positions)}
+                    distribute = len(orig) > 1 and hira != orig and kanji_positions
+                    if distribute:
+                        chars_per_kanji = len(hira) // len(kanji_positions)
+                    
+                    for char_index, char in enumerate(orig):
+                        kanji_idx = kanji_index.get(char_index)
+                        is_kanji = kanji_idx is not None
                         furigana = None
                         
                         if is_kanji:
                             if len(orig) == 1 and hira != orig:
                                 furigana = hira
-                            elif len(orig) > 1 and hira != orig:
+                            elif distribute:
                                 # Distribute reading across kanji characters
-                                kanji_positions = [i for i, c in enumerate(orig) if self._is_kanji(c)]
-                                if char in orig and kanji_positions:
-                                    char_index = orig.index(char)
-                                    if char_index in kanji_positions:
-                                        kanji_idx = kanji_positions.index(char_index)
-                                        chars_per_kanji = len(hira) // len(kanji_positions)
-                                        start = kanji_idx * chars_per_kanji
-                                        end = start + chars_per_kanji
-                                        if kanji_idx == len(kanji_positions) - 1:
-                                            end = len(hira)
-                                        furigana = hira[start:end] if end > start else None
+                                start = kanji_idx * chars_per_kanji
+                                end = start + chars_per_kanji
+                                if kanji_idx == len(kanji_positions) - 1:
+                                    end = len(hira)
+                                furigana = hira[start:end] if end > start else None
                         
                         result.append(FuriganaChar(char, furigana, is_kanji))
                 else:
@@ -219,10 +478,11 @@ class EnhancedFuriganaGenerator:
         """Process pykakasi old API results"""
         result = []
         
+        mask = kanji_mask(text).tolist()
+        
         if isinstance(conversion, str):
             # Character by character mapping
-            for i, char in enumerate(text):
-                is_kanji = self._is_kanji(char)
+            for i, (char, is_kanji) in enumerate(zip(text, mask)):
                 furigana = None
                 
                 if is_kanji and i < len(conversion) and conversion[i] != char:
@@ -230,26 +490,21 @@ class EnhancedFuriganaGenerator:
                 
                 result.append(FuriganaChar(char, furigana, is_kanji))
         else:
-            for char in text:
-                result.append(FuriganaChar(char, None, self._is_kanji(char)))
+            for char, is_kanji in zip(text, mask):
+                result.append(FuriganaChar(char, None, is_kanji))
         
         return result
     
     def _generate_enhanced_fallback(self, text: str) -> List[FuriganaChar]:
         """Enhanced fallback with comprehensive kanji mapping"""
-        result = []
-        
-        for char in text:
-            is_kanji = self._is_kanji(char)
-            furigana = self.kanji_readings.get(char) if is_kanji else None
-            result.append(FuriganaChar(char, furigana, is_kanji))
-        
-        return result
+        table = self._reading_table
+        return [FuriganaChar(char, table[ord(char) - KANJI_FIRST] if is_kanji else None, is_kanji)
+                for char, is_kanji in zip(text, kanji_mask(text).tolist())]
     
     def _distribute_furigana_smart(self, surface: str, reading: str) -> List[FuriganaChar]:
         """Smart distribution of furigana across characters"""
         result = []
-        kanji_chars = [i for i, c in enumerate(surface) if self._is_kanji(c)]
+        kanji_chars = [match.start() for match in self._kanji_re.finditer(surface)]
         
         if not kanji_chars:
             for char in surface:
@@ -259,20 +514,22 @@ class EnhancedFuriganaGenerator:
         # Smart distribution based on character patterns
         if len(kanji_chars) == 1:
             # Single kanji gets all reading
+            kanji_pos = kanji_chars[0]
             for i, char in enumerate(surface):
-                is_kanji = self._is_kanji(char)
-                furigana = reading if (is_kanji and i == kanji_chars[0]) else None
+                is_kanji = i == kanji_pos
+                furigana = reading if is_kanji else None
                 result.append(FuriganaChar(char, furigana, is_kanji))
         else:
             # Multiple kanji - distribute reading
             reading_per_kanji = len(reading) // len(kanji_chars)
+            kanji_index = {pos: idx for idx, pos in enumerate(kanji_chars)}
             
             for i, char in enumerate(surface):
-                is_kanji = self._is_kanji(char)
+                kanji_idx = kanji_index.get(i)
+                is_kanji = kanji_idx is not None
                 furigana = None
                 
-                if is_kanji and i in kanji_chars:
-                    kanji_idx = kanji_chars.index(i)
+                if is_kanji:
                     start_idx = kanji_idx * reading_per_kanji
                     end_idx = start_idx + reading_per_kanji
                     if kanji_idx == len(kanji_chars) - 1:
@@ -281,7 +538,7 @@ class EnhancedFuriganaGenerator:
                 
                 # Fallback to dictionary if no furigana assigned
                 if is_kanji and not furigana:
-                    furigana = self.kanji_readings.get(char)
+                    furigana = self._fallback_reading(char)
                 
                 result.append(FuriganaChar(char, furigana, is_kanji))
         
@@ -293,13 +550,30 @@ class EnhancedFuriganaGenerator:
     
     def _katakana_to_hiragana(self, text: str) -> str:
         """Convert katakana to hiragana"""
-        result = ""
-        for char in text:
-            if '\u30a1' <= char <= '\u30f6':
-                result += chr(ord(char) - 0x60)
-            else:
-                result += char
-        return result
+        return text.translate(self._kata_table)
+
+
+@functools.lru_cache(maxsize=64)
+def _load_japanese_font(size: int) -> ImageFont.FreeTypeFont:
+    """Load Japanese font once per size (path probing and FreeType init are cached)"""
+    font_paths = [
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
+        "/usr/share/fonts/truetype/takao-gothic/TakaoPGothic.ttf",
+        "/usr/share/fonts/truetype/vlgothic/VL-Gothic-Regular.ttf",
+        "/System/Library/Fonts/Hiragino Sans GB.ttc",
+        "/Windows/Fonts/msgothic.ttc",
+        os.path.expanduser("~/.local/share/fonts/NotoSansJP-Regular.otf"),
+    ]
+    
+    for font_path in font_paths:
+        try:
+            if os.path.exists(font_path):
+                return ImageFont.truetype(font_path, size)
+        except Exception:
+            continue
+    
+    return ImageFont.load_default()
 
 
 class SmartFuriganaRenderer:
@@ -313,59 +587,26 @@ class SmartFuriganaRenderer:
         self.line_spacing = 1.2
         self.furigana_spacing = 0.3
         
+        # Glyph bbox sizes keyed by (font path, font size, text); subtitles reuse a small glyph set
+        self._measure_draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+        self._text_size_cache = {}
+        
         print(f"🎨 Renderer initialized: main={main_font_size}px, furigana={furigana_font_size}px")
     
     def _load_font(self, size: int) -> ImageFont.FreeTypeFont:
         """Load Japanese font with comprehensive search"""
-        font_paths = [
-            "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-            "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
-            "/usr/share/fonts/truetype/takao-gothic/TakaoPGothic.ttf",
-            "/usr/share/fonts/truetype/vlgothic/VL-Gothic-Regular.ttf",
-            "/System/Library/Fonts/Hiragino Sans GB.ttc",
-            "/Windows/Fonts/msgothic.ttc",
-            os.path.expanduser("~/.local/share/fonts/NotoSansJP-Regular.otf"),
-        ]
-        
-        for font_path in font_paths:
-            try:
-                if os.path.exists(font_path):
-                    return ImageFont.truetype(font_path, size)
-            except Exception:
-                continue
-        
-        return ImageFont.load_default()
+        return _load_japanese_font(size)
     
-    def measure_text_with_furigana(self, furigana_chars: List[FuriganaChar], 
-                                  max_width: Optional[int] = None) -> Tuple[int, int]:
+    def measure_text_with_furigana(self, line: FuriganaLine, 
+                                  max_width: Optional[int] = None,
+                                  layout: Optional[TextLayout] = None) -> Tuple[int, int]:
         """Measure text with optional width constraint"""
-        if not furigana_chars:
+        if not line:
             return 0, 0
         
-        temp_img = Image.new('RGB', (1, 1))
-        temp_draw = ImageDraw.Draw(temp_img)
-        
-        total_width = 0
-        max_height = 0
-        
-        for char_info in furigana_chars:
-            char_bbox = temp_draw.textbbox((0, 0), char_info.char, font=self.main_font)
-            char_width = char_bbox[2] - char_bbox[0]
-            char_height = char_bbox[3] - char_bbox[1]
-            
-            furigana_width = 0
-            if char_info.furigana:
-                furigana_bbox = temp_draw.textbbox((0, 0), char_info.furigana, font=self.furigana_font)
-                furigana_width = furigana_bbox[2] - furigana_bbox[0]
-            
-            column_width = max(char_width, furigana_width)
-            total_width += column_width
-            
-            total_height = char_height
-            if char_info.furigana:
-                total_height += self.furigana_font_size + int(self.furigana_font_size * self.furigana_spacing)
-            
-            max_height = max(max_height, total_height)
+        if layout is None:
+            layout = self.layout_text_with_furigana(line)
+        total_width, max_height = layout.width, layout.height
         
         # Apply width constraint if specified
         if max_width and total_width > max_width:
@@ -375,10 +616,16 @@ class SmartFuriganaRenderer:
         
         return total_width, max_height
     
-    def render_text_with_furigana(self, furigana_chars: List[FuriganaChar], 
+    def layout_text_with_furigana(self, line: FuriganaLine) -> TextLayout:
+        """Measure every column once at the renderer's base font sizes"""
+        return self._measure_with_fonts(line, self.main_font, 
+                                        self.furigana_font, self.furigana_font_size)
+    
+    def render_text_with_furigana(self, line: FuriganaLine, 
                                  width: int, height: int, 
-                                 scale_factor: float = 1.0) -> Image.Image:
-        """Render text with furigana with optional scaling"""
+                                 scale_factor: float = 1.0,
+                                 layout: Optional[TextLayout] = None) -> Image.Image:
+        """Render text with furigana with optional scaling (reuses layout at scale 1.0)"""
         img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
         draw = ImageDraw.Draw(img)
         
@@ -389,22 +636,16 @@ class SmartFuriganaRenderer:
         main_font = self._load_font(actual_main_size) if scale_factor != 1.0 else self.main_font
         furigana_font = self._load_font(actual_furigana_size) if scale_factor != 1.0 else self.furigana_font
         
-        text_width, text_height = self._measure_with_fonts(furigana_chars, main_font, furigana_font)
+        if layout is None or scale_factor != 1.0:
+            layout = self._measure_with_fonts(line, main_font, 
+                                              furigana_font, actual_furigana_size)
         
-        start_x = max(0, (width - text_width) // 2)
-        start_y = max(0, (height - text_height) // 2)
+        start_x = max(0, (width - layout.width) // 2)
+        start_y = max(0, (height - layout.height) // 2)
         current_x = start_x
         
-        for char_info in furigana_chars:
-            char_bbox = draw.textbbox((0, 0), char_info.char, font=main_font)
-            char_width = char_bbox[2] - char_bbox[0]
-            char_height = char_bbox[3] - char_bbox[1]
-            
-            furigana_width = 0
-            if char_info.furigana:
-                furigana_bbox = draw.textbbox((0, 0), char_info.furigana, font=furigana_font)
-                furigana_width = furigana_bbox[2] - furigana_bbox[0]
-            
+        for char, furigana, (char_width, _, furigana_width) in zip(
+                line.chars, line.furigana, layout.columns):
             column_width = max(char_width, furigana_width)
             
             # Position main character
@@ -413,59 +654,62 @@ class SmartFuriganaRenderer:
             
             # Draw character with stroke
             stroke_width = max(1, int(2 * scale_factor))
-            self._draw_text_with_stroke(draw, char_x, char_y, char_info.char, main_font, stroke_width)
+            self._draw_text_with_stroke(draw, char_x, char_y, char, main_font, stroke_width)
             
             # Draw furigana if present
-            if char_info.furigana:
+            if furigana:
                 furigana_x = current_x + (column_width - furigana_width) // 2
                 furigana_y = start_y
-                self._draw_text_with_stroke(draw, furigana_x, furigana_y, char_info.furigana, furigana_font, stroke_width)
+                self._draw_text_with_stroke(draw, furigana_x, furigana_y, furigana, furigana_font, stroke_width)
             
             current_x += column_width
         
         return img
     
-    def _measure_with_fonts(self, furigana_chars: List[FuriganaChar], 
+    def _measure_with_fonts(self, line: FuriganaLine, 
                            main_font: ImageFont.FreeTypeFont, 
-                           furigana_font: ImageFont.FreeTypeFont) -> Tuple[int, int]:
+                           furigana_font: ImageFont.FreeTypeFont,
+                           furigana_size: int) -> TextLayout:
         """Measure text with specific fonts"""
-        temp_img = Image.new('RGB', (1, 1))
-        temp_draw = ImageDraw.Draw(temp_img)
-        
+        columns = []
         total_width = 0
         max_height = 0
+        furigana_offset = furigana_size + int(furigana_size * self.furigana_spacing)
         
-        for char_info in furigana_chars:
-            char_bbox = temp_draw.textbbox((0, 0), char_info.char, font=main_font)
-            char_width = char_bbox[2] - char_bbox[0]
-            char_height = char_bbox[3] - char_bbox[1]
+        for char, furigana in zip(line.chars, line.furigana):
+            char_width, char_height = self._text_size(char, main_font)
             
             furigana_width = 0
-            if char_info.furigana:
-                furigana_bbox = temp_draw.textbbox((0, 0), char_info.furigana, font=furigana_font)
-                furigana_width = furigana_bbox[2] - furigana_bbox[0]
+            if furigana:
+                furigana_width = self._text_size(furigana, furigana_font)[0]
             
+            columns.append((char_width, char_height, furigana_width))
             total_width += max(char_width, furigana_width)
             
             total_height = char_height
-            if char_info.furigana:
-                total_height += furigana_font.size + int(furigana_font.size * self.furigana_spacing)
+            if furigana:
+                total_height += furigana_offset
             
             max_height = max(max_height, total_height)
         
-        return total_width, max_height
+        return TextLayout(columns, total_width, max_height)
+    
+    def _text_size(self, text: str, font: ImageFont.FreeTypeFont) -> Tuple[int, int]:
+        """Cached textbbox width/height for text in font"""
+        # id(font) is unsafe: evicted fonts from _load_japanese_font free their id for reuse
+        key = (getattr(font, 'path', None), getattr(font, 'size', None), text)
+        size = self._text_size_cache.get(key)
+        if size is None:
+            bbox = self._measure_draw.textbbox((0, 0), text, font=font)
+            size = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+            self._text_size_cache[key] = size
+        return size
     
     def _draw_text_with_stroke(self, draw: ImageDraw.Draw, x: int, y: int, text: str, 
                               font: ImageFont.FreeTypeFont, stroke_width: int):
-        """Draw text with stroke outline"""
-        # Draw stroke
-        for dx in range(-stroke_width, stroke_width + 1):
-            for dy in range(-stroke_width, stroke_width + 1):
-                if dx*dx + dy*dy <= stroke_width*stroke_width:
-                    draw.text((x + dx, y + dy), text, font=font, fill=(0, 0, 0, 255))
-        
-        # Draw main text
-        draw.text((x, y), text, font=font, fill=(255, 255, 255, 255))
+        """Draw text with stroke outline (single pass via FreeType's stroker)"""
+        draw.text((x, y), text, font=font, fill=(255, 255, 255, 255),
+                  stroke_width=stroke_width, stroke_fill=(0, 0, 0, 255))
 
 
 class SRTParser:
@@ -473,37 +717,248 @@ class SRTParser:
     
     @staticmethod
     def parse_srt(srt_content: str) -> List[SubtitleSegment]:
-        """Parse SRT content into subtitle segments"""
+        """Parse SRT content into subtitle segments (single regex pass)"""
         segments = []
-        blocks = re.split(r'\n\s*\n', srt_content.strip())
         
-        for block in blocks:
-            lines = block.strip().split('\n')
-            if len(lines) < 3:
-                continue
+        for match in _SRT_BLOCK_RE.finditer(srt_content):
+            segment = SRTParser._segment_from_match(match.groups()[:8], match.group(9))
+            if segment:
+                segments.append(segment)
+        
+        return segments
+    
+    @staticmethod
+    def parse_srt_file(srt_path: str) -> List[SubtitleSegment]:
+        """Parse an SRT file by scanning it memory-mapped, decoding only cue text"""
+        segments = []
+        
+        with open(srt_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return segments
             
-            timestamp_line = lines[1]
-            match = re.match(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}),(\d{3})', 
-                           timestamp_line)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for match in _SRT_BLOCK_BYTES_RE.finditer(data):
+                    segment = SRTParser._segment_from_match(
+                        match.groups()[:8], match.group(9).decode('utf-8')
+                    )
+                    if segment:
+                        segments.append(segment)
+        
+        return segments
+    
+    @staticmethod
+    def _segment_from_match(timestamps, text: str) -> Optional[SubtitleSegment]:
+        """Build a segment from the eight timestamp fields and the cue text"""
+        (start_h, start_m, start_s, start_ms, 
+         end_h, end_m, end_s, end_ms) = map(int, timestamps)
+        
+        start_time = start_h * 3600 + start_m * 60 + start_s + start_ms / 1000
+        end_time = end_h * 3600 + end_m * 60 + end_s + end_ms / 1000
+        
+        text = text.strip().replace('\r', '').replace('\n', ' ')
+        if not text:  # Only add non-empty subtitles
+            return None
+        return SubtitleSegment(start_time, end_time, text)
+
+
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_has_encoder(name: str) -> bool:
+    """Check whether the installed ffmpeg was built with the given encoder"""
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], 
+                                capture_output=True, text=True)
+    except OSError:
+        return False
+    return any(line.split()[1:2] == [name] for line in result.stdout.splitlines())
+
+
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_encoder_works(name: str) -> bool:
+    """Encode one test frame: distro and static ffmpeg builds list NVENC even without an NVIDIA GPU"""
+    if not _ffmpeg_has_encoder(name):
+        return False
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+           '-f', 'lavfi', '-i', 'nullsrc=s=256x256', '-frames:v', '1',
+           '-c:v', name, '-f', 'null', '-']
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+def _resolve_ffmpeg_encoder(encoder: str) -> str:
+    """Map 'auto' to NVENC when it can actually encode here, otherwise libx264"""
+    if encoder == 'auto':
+        return 'h264_nvenc' if _ffmpeg_encoder_works('h264_nvenc') else 'libx264'
+    return encoder
+
+
+def _ffmpeg_encoder_args(encoder: str, crf: int, preset: str = 'veryfast') -> List[str]:
+    """Video codec arguments at a comparable quality level for each encoder"""
+    if encoder == 'h264_nvenc':
+        return ['-c:v', 'h264_nvenc', '-preset', 'p4', '-cq', str(crf + 1)]
+    return ['-c:v', 'libx264', '-preset', preset, '-crf', str(crf)]
+
+
+class FFmpegVideoWriter:
+    """cv2.VideoWriter-compatible writer that pipes raw BGR frames to ffmpeg"""
+    
+    def __init__(self, output_path: str, fps: float, frame_size: Tuple[int, int],
+                 crf: int = 20, preset: str = 'veryfast', encoder: str = 'libx264'):
+        width, height = frame_size
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-vcodec', 'rawvideo',
+            '-s', f"{width}x{height}", '-pix_fmt', 'bgr24', '-r', f"{fps}",
+            '-i', '-',
+        ] + _ffmpeg_encoder_args(encoder, crf, preset) + ['-pix_fmt', 'yuv420p', output_path]
+        self.encoder = encoder
+        self.returncode = None
+        try:
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        except OSError as e:
+            print(f"⚠️  Could not start ffmpeg: {e}")
+            self._proc = None
+    
+    def isOpened(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+    
+    def write(self, frame: np.ndarray):
+        self._proc.stdin.write(np.ascontiguousarray(frame).data)
+    
+    def release(self) -> bool:
+        """Close the pipe and wait for ffmpeg; False unless it exited cleanly"""
+        if self._proc is not None:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass  # ffmpeg already exited; its exit code says why
+            self.returncode = self._proc.wait()
+            self._proc = None
+        return self.returncode == 0
+
+
+def _release_writer(out) -> bool:
+    """Release either writer type; cv2.VideoWriter reports no encode status"""
+    if isinstance(out, FFmpegVideoWriter):
+        return out.release()
+    out.release()
+    return True
+
+
+# Bump when rendering output changes so stale on-disk cues are not reused
+RENDER_CACHE_VERSION = 2
+
+# Oldest cues are evicted once the on-disk render cache grows past this
+RENDER_CACHE_MAX_BYTES = 256 << 20
+
+# Frames buffered between the decode, blend and encode stages
+PIPELINE_DEPTH = 32
+
+
+def _put_unless_stopped(frames: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the consumer has signalled stop"""
+    while not stop.is_set():
+        try:
+            frames.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _decode_frames(cap: cv2.VideoCapture, frames: queue.Queue, stop: threading.Event):
+    """Reader thread: queue decoded frames, then None at end of stream"""
+    while not stop.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if not _put_unless_stopped(frames, frame, stop):
+            return
+    _put_unless_stopped(frames, None, stop)
+
+
+def _write_frames(out, frames: queue.Queue, failed: threading.Event):
+    """Writer thread: encode queued frames in order until None arrives
+    
+    A write error sets failed for the caller to check after joining.
+    """
+    while True:
+        frame = frames.get()
+        if frame is None:
+            break
+        if failed.is_set():
+            continue  # Keep draining so the producer never blocks
+        try:
+            out.write(frame)
+        except Exception as e:
+            log.error(f"❌ Writing frame failed: {e}")
+            failed.set()
+
+
+def _seek_to_frame(cap: cv2.VideoCapture, frame_index: int) -> bool:
+    """Position cap on frame_index, grabbing forward when the seek lands short
+    
+    OpenCV's frame seek can miss by a few frames on B-frame or non-zero start time
+    streams; False if it overshot or the stream ended first.
+    """
+    if frame_index > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    while position < frame_index:
+        if not cap.grab():
+            return False
+        position += 1
+    return position == frame_index
+
+
+def _burn_frame_range(video_path: str, chunk_path: str, frame_segments: np.ndarray, 
+                      chunk_segments: dict, start_frame: int, fps: float, 
+                      width: int, height: int, read_to_end: bool, encoder: str) -> int:
+    """Worker: burn subtitles onto one frame range and encode it to chunk_path
+    
+    chunk_segments maps segment index -> (start_time, end_time, overlay) for the
+    segments visible in this range. Returns the number of frames written.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not _seek_to_frame(cap, start_frame):
+        position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        cap.release()
+        # A misplaced chunk would shift every cue in it against frame_segments
+        raise RuntimeError(f"Could not seek to frame {start_frame} (landed on {position})")
+    out = FFmpegVideoWriter(chunk_path, fps, (width, height), encoder=encoder)
+    frame_count = 0
+    
+    try:
+        while frame_count < len(frame_segments) or read_to_end:
+            ret, frame = cap.read()
+            if not ret:
+                break
             
-            if not match:
-                continue
+            if frame_count == 0:
+                chunk_segments = {index: entry for index, entry in chunk_segments.items()
+                                  if entry[2].fits(frame.shape)}
             
-            start_time = (int(match.group(1)) * 3600 + 
-                         int(match.group(2)) * 60 + 
-                         int(match.group(3)) + 
-                         int(match.group(4)) / 1000)
+            if frame_count < len(frame_segments):
+                segment_index = frame_segments[frame_count]
+            else:
+                current_time = (start_frame + frame_count) / fps
+                segment_index = next((index for index, (start, end, _) in sorted(chunk_segments.items())
+                                      if start <= current_time <= end), -1)
             
-            end_time = (int(match.group(5)) * 3600 + 
-                       int(match.group(6)) * 60 + 
-                       int(match.group(7)) + 
-                       int(match.group(8)) / 1000)
+            if segment_index in chunk_segments:
+                _blend_overlay(frame, chunk_segments[segment_index][2])
             
-            text = ' '.join(lines[2:]).strip()
-            if text:  # Only add non-empty subtitles
-                segments.append(SubtitleSegment(start_time, end_time, text))
-        
-        return segments
+            out.write(frame)
+            frame_count += 1
+    finally:
+        cap.release()
+        encoded = out.release()
+    
+    if not encoded:
+        raise RuntimeError(f"{encoder} exited with code {out.returncode} on {chunk_path}")
+    return frame_count
 
 
 class CompleteFuriganaSubtitleBurner:
@@ -519,7 +974,12 @@ class CompleteFuriganaSubtitleBurner:
             'max_subtitle_width_ratio': 0.9,  # Max 90% of frame width
             'auto_scale': True,
             'stroke_width': 2,
-            'preview_mode': False
+            'preview_mode': False,
+            'backend': 'opencv',  # 'opencv' (frame loop) or 'ffmpeg' (overlay filter)
+            'hw_decode': True,    # Ask OpenCV's FFmpeg backend for hardware decoding
+            'workers': 1,         # >1 splits the OpenCV backend into parallel time chunks
+            'ffmpeg_encoder': 'auto',  # Any ffmpeg encode: 'auto' prefers h264_nvenc over libx264
+            'render_cache_dir': '~/.cache/furigana'  # Rendered cues reused across runs; None disables
         }
         
         if config:
@@ -544,26 +1004,28 @@ class CompleteFuriganaSubtitleBurner:
             
             # Read and validate SRT file
             try:
-                with open(srt_path, 'r', encoding='utf-8') as f:
-                    srt_content = f.read()
+                segments = SRTParser.parse_srt_file(srt_path)
             except Exception as e:
                 print(f"❌ Failed to read SRT file: {e}")
                 return False
             
-            segments = SRTParser.parse_srt(srt_content)
             if not segments:
                 print("❌ No valid subtitle segments found")
                 return False
             
             print(f"📝 Loaded {len(segments)} subtitle segments")
             
+            # Generate furigana once per segment instead of once per frame
+            for segment in segments:
+                segment.furigana = self.furigana_generator.generate_furigana_line(segment.text)
+            
             # Show sample segments
             for i, seg in enumerate(segments[:3]):
                 furigana_preview = self._generate_furigana_preview(seg.text)
                 print(f"   {i+1}: {seg.text} → {furigana_preview}")
             
             # Open and validate video
-            cap = cv2.VideoCapture(video_path)
+            cap = self._open_video_capture(video_path)
             if not cap.isOpened():
                 print(f"❌ Could not open video: {video_path}")
                 return False
@@ -581,102 +1043,415 @@ class CompleteFuriganaSubtitleBurner:
             
             print(f"🎥 Video: {width}x{height}, {fps:.2f} fps, {total_frames} frames")
             
-            # Create video writer
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+            # Pre-render each subtitle once; the image is identical for all its frames
+            max_subtitle_width = int(width * self.config['max_subtitle_width_ratio'])
+            for segment in segments:
+                try:
+                    rendered = self._render_subtitle_overlay_cached(
+                        segment.furigana, width, height, max_subtitle_width
+                    )
+                except Exception as e:
+                    log.warning(f"⚠️  Error rendering subtitle at {segment.start_time:.2f}s: {e}")
+                    rendered = None
+                if rendered:
+                    segment.overlay = SubtitleOverlay.from_rgba(*rendered)
+            self._trim_render_cache()
             
-            if not out.isOpened():
-                print(f"❌ Could not create output video: {output_path}")
-                cap.release()
+            if self.config.get('backend') == 'ffmpeg':
+                if shutil.which('ffmpeg'):
+                    cap.release()
+                    if not self._burn_with_ffmpeg(video_path, segments, output_path):
+                        return False
+                    return self._verify_output(output_path)
+                print("⚠️  ffmpeg not found, falling back to OpenCV backend")
+            
+            workers = self.config.get('workers', 1)
+            if workers > 1:
+                if shutil.which('ffmpeg'):
+                    cap.release()
+                    if not self._burn_parallel(video_path, segments, output_path, 
+                                               fps, width, height, total_frames, workers):
+                        return False
+                    return self._verify_output(output_path)
+                print("⚠️  ffmpeg not found, processing on a single worker")
+            
+            # A hardware encoder can still fail mid-run (sessions, VRAM); libx264 is the fallback.
+            # Only decode, blend and encode are redone, with the encoder kept local to this video
+            encoder = _resolve_ffmpeg_encoder(self.config.get('ffmpeg_encoder', 'auto'))
+            for encoder in dict.fromkeys([encoder, 'libx264']):
+                if cap is None:
+                    cap = self._open_video_capture(video_path)
+                out = self._create_video_writer(output_path, fps, width, height, encoder)
+                
+                if not out.isOpened():
+                    print(f"❌ Could not create output video: {output_path}")
+                    cap.release()
+                    return False
+                
+                encoded = self._burn_frames(cap, out, segments, fps, total_frames)
+                cap = None  # Released by _burn_frames
+                if encoded or not isinstance(out, FFmpegVideoWriter):
+                    break
+                print(f"⚠️  {encoder} failed")
+            
+            if not encoded:
+                print(f"❌ Encoding failed: {output_path}")
                 return False
             
-            # Process video
-            frame_count = 0
-            max_subtitle_width = int(width * self.config['max_subtitle_width_ratio'])
+            return self._verify_output(output_path)
+        
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+            return False
+    
+    def _burn_frames(self, cap: cv2.VideoCapture, out, segments: List[SubtitleSegment],
+                     fps: float, total_frames: int) -> bool:
+        """Decode, blend and encode every frame; releases cap and out, True if the encode succeeded"""
+        # Process video; the active segment is an O(1) table lookup per frame
+        frame_segments = self._build_frame_segment_table(segments, fps, total_frames)
+        frame_count = 0
+        
+        # Decode and encode run in their own threads (OpenCV releases the GIL),
+        # so this thread only looks up and blends
+        decoded = queue.Queue(maxsize=PIPELINE_DEPTH)
+        blended = queue.Queue(maxsize=PIPELINE_DEPTH)
+        stop = threading.Event()
+        write_failed = threading.Event()
+        reader = threading.Thread(target=_decode_frames, args=(cap, decoded, stop), daemon=True)
+        writer = threading.Thread(target=_write_frames, args=(out, blended, write_failed), daemon=True)
+        reader.start()
+        writer.start()
+        
+        try:
+            while not write_failed.is_set():
+                frame = decoded.get()
+                if frame is None:
+                    break
+                
+                if frame_count == 0:
+                    # Decoded geometry is fixed, so bounds are checked once here
+                    self._validate_overlays(segments, frame.shape)
+                
+                # Find active subtitle
+                if frame_count < total_frames:
+                    segment_index = frame_segments[frame_count]
+                else:
+                    # Reported frame count can be an estimate; scan past its end
+                    segment_index = self._find_segment_index(segments, frame_count / fps)
+                
+                # Add subtitle if present
+                if segment_index >= 0 and segments[segment_index].overlay is not None:
+                    try:
+                        frame = self._blend_subtitle_overlay(
+                            frame, segments[segment_index].overlay
+                        )
+                    except Exception as e:
+                        log.warning(f"⚠️  Error adding subtitle at {frame_count / fps:.2f}s: {e}")
+                        # Continue without subtitle for this frame
+                
+                blended.put(frame)
+                frame_count += 1
+                
+                # Progress updates
+                if frame_count % 100 == 0:
+                    progress = (frame_count / total_frames) * 100
+                    print(f"⏳ Progress: {progress:.1f}% ({frame_count}/{total_frames})")
+                
+                # Preview mode - process only first 300 frames
+                if self.config.get('preview_mode') and frame_count >= 300:
+                    print("🎯 Preview mode - stopping at 10 seconds")
+                    break
+        
+        finally:
+            stop.set()
+            blended.put(None)
+            reader.join()
+            writer.join()
+            cap.release()
+            encoded = _release_writer(out) and not write_failed.is_set()
+        
+        return encoded
+    
+    def _validate_overlays(self, segments: List[SubtitleSegment], 
+                           frame_shape: Tuple[int, ...]):
+        """Drop overlays that do not fit the decoded frames"""
+        for segment in segments:
+            if segment.overlay is not None and not segment.overlay.fits(frame_shape):
+                log.warning(f"⚠️  Dimension mismatch: subtitle {segment.overlay.bgr.shape} "
+                            f"at ({segment.overlay.x}, {segment.overlay.y}) vs frame {frame_shape}")
+                segment.overlay = None
+    
+    def _build_frame_segment_table(self, segments: List[SubtitleSegment], 
+                                   fps: float, total_frames: int) -> np.ndarray:
+        """Map each frame index to its active segment index, or -1"""
+        frame_segments = np.full(total_frames, -1, dtype=np.int32)
+        
+        # Fill in reverse so the first listed segment wins where cues overlap
+        for index in range(len(segments) - 1, -1, -1):
+            segment = segments[index]
+            first = max(0, math.ceil(segment.start_time * fps))
+            last = min(total_frames, math.floor(segment.end_time * fps) + 1)
+            if first < last:
+                frame_segments[first:last] = index
+        
+        return frame_segments
+    
+    def _find_segment_index(self, segments: List[SubtitleSegment], current_time: float) -> int:
+        """Index of the first segment active at current_time, or -1"""
+        for index, segment in enumerate(segments):
+            if segment.start_time <= current_time <= segment.end_time:
+                return index
+        return -1
+    
+    def _open_video_capture(self, video_path: str) -> cv2.VideoCapture:
+        """Open the input, requesting VA-API/NVDEC/D3D11 decoding when supported"""
+        if self.config.get('hw_decode') and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+            cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [
+                cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY
+            ])
+            if cap.isOpened():
+                return cap
+            cap.release()
+        
+        return cv2.VideoCapture(video_path)
+    
+    def _create_video_writer(self, output_path: str, fps: float, width: int, height: int, encoder: str):
+        """Encode with the given encoder through ffmpeg when available, else OpenCV's mp4v"""
+        if shutil.which('ffmpeg'):
+            out = FFmpegVideoWriter(output_path, fps, (width, height), encoder=encoder)
+            if out.isOpened():
+                return out
+            print("⚠️  ffmpeg writer failed to start, falling back to OpenCV mp4v")
+        
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        return cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    
+    def _burn_parallel(self, video_path: str, segments: List[SubtitleSegment], 
+                       output_path: str, fps: float, width: int, height: int, 
+                       total_frames: int, workers: int) -> bool:
+        """Burn time-sliced chunks in worker processes and concatenate with ffmpeg"""
+        frame_segments = self._build_frame_segment_table(segments, fps, total_frames)
+        preview = self.config.get('preview_mode')
+        frame_limit = min(total_frames, 300) if preview else total_frames
+        bounds = np.linspace(0, frame_limit, workers + 1).astype(int)
+        
+        # Consumer GPUs cap concurrent NVENC sessions, so 'auto' stays on libx264 here
+        encoder = self.config.get('ffmpeg_encoder', 'auto')
+        encoder = 'libx264' if encoder == 'auto' else encoder
+        
+        print(f"⚡ Burning {frame_limit} frames in {workers} parallel chunks")
+        
+        with tempfile.TemporaryDirectory(prefix='furigana_') as temp_dir:
+            chunk_paths = []
+            futures = []
             
-            try:
-                while True:
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-                    
-                    current_time = frame_count / fps
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for i in range(workers):
+                    first, last = int(bounds[i]), int(bounds[i + 1])
+                    read_to_end = i == workers - 1 and not preview
+                    start_time, end_time = first / fps, last / fps
                     
-                    # Find active subtitle
-                    active_subtitle = None
-                    for segment in segments:
-                        if segment.start_time <= current_time <= segment.end_time:
-                            active_subtitle = segment
-                            break
+                    # Ship only the overlays this chunk can show
+                    chunk_segments = {
+                        index: (seg.start_time, seg.end_time, seg.overlay)
+                        for index, seg in enumerate(segments)
+                        if seg.overlay is not None and seg.end_time >= start_time 
+                        and (read_to_end or seg.start_time <= end_time)
+                    }
+                    chunk_table = frame_segments[first:last].copy()
+                    chunk_table[~np.isin(chunk_table, list(chunk_segments))] = -1
                     
-                    # Add subtitle if present
-                    if active_subtitle:
-                        try:
-                            frame = self._add_subtitle_to_frame_safe(
-                                frame, active_subtitle.text, 
-                                width, height, max_subtitle_width
-                            )
-                        except Exception as e:
-                            print(f"⚠️  Error adding subtitle at {current_time:.2f}s: {e}")
-                            # Continue without subtitle for this frame
-                    
-                    out.write(frame)
-                    frame_count += 1
-                    
-                    # Progress updates
-                    if frame_count % 100 == 0:
-                        progress = (frame_count / total_frames) * 100
-                        print(f"⏳ Progress: {progress:.1f}% ({frame_count}/{total_frames})")
-                    
-                    # Preview mode - process only first 300 frames
-                    if self.config.get('preview_mode') and frame_count >= 300:
-                        print("🎯 Preview mode - stopping at 10 seconds")
-                        break
+                    chunk_path = os.path.join(temp_dir, f"chunk_{i:03d}.mp4")
+                    chunk_paths.append(chunk_path)
+                    futures.append(pool.submit(
+                        _burn_frame_range, video_path, chunk_path, chunk_table, 
+                        chunk_segments, first, fps, width, height, read_to_end, encoder
+                    ))
+                
+                frames_written = sum(future.result() for future in futures)
             
-            finally:
-                cap.release()
-                out.release()
+            print(f"⏳ Encoded {frames_written} frames, concatenating chunks")
             
-            print(f"✅ Video saved successfully: {output_path}")
+            list_path = os.path.join(temp_dir, 'chunks.txt')
+            with open(list_path, 'w', encoding='utf-8') as f:
+                for chunk_path in chunk_paths:
+                    f.write(f"file '{chunk_path}'\n")
             
-            # Verify output file
-            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                print(f"📊 Output size: {os.path.getsize(output_path):,} bytes")
-                return True
-            else:
-                print("❌ Output file is invalid or empty")
-                return False
+            result = subprocess.run([
+                'ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                '-i', list_path, '-c', 'copy', output_path
+            ])
         
-        except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+        if result.returncode != 0:
+            print(f"❌ ffmpeg concat failed with exit code {result.returncode}")
+            return False
+        return True
+    
+    def _verify_output(self, output_path: str) -> bool:
+        """Check that the output video was written"""
+        print(f"✅ Video saved successfully: {output_path}")
+        
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            print(f"📊 Output size: {os.path.getsize(output_path):,} bytes")
+            return True
+        else:
+            print("❌ Output file is invalid or empty")
+            return False
+    
+    def _burn_with_ffmpeg(self, video_path: str, segments: List[SubtitleSegment], 
+                          output_path: str) -> bool:
+        """Compose pre-rendered subtitle PNGs with ffmpeg's overlay filter
+        
+        Decoding, blending and encoding all run inside ffmpeg; Python only
+        writes one PNG per segment and the filter graph.
+        """
+        overlay_segments = [seg for seg in segments if seg.overlay is not None]
+        
+        with tempfile.TemporaryDirectory(prefix='furigana_') as temp_dir:
+            inputs = ['-i', video_path]
+            filters = []
+            last_label = '0:v'
+            
+            for i, segment in enumerate(overlay_segments, start=1):
+                png_path = os.path.join(temp_dir, f"subtitle_{i:05d}.png")
+                cv2.imwrite(png_path, segment.overlay.to_bgra())
+                inputs += ['-i', png_path]
+                
+                label = f"v{i}"
+                filters.append(
+                    f"[{last_label}][{i}:v]overlay=x={segment.overlay.x}:y={segment.overlay.y}:format=auto:"
+                    f"enable='between(t,{segment.start_time:.3f},{segment.end_time:.3f})'[{label}]"
+                )
+                last_label = label
+            
+            if filters:
+                # Long graphs exceed command-line limits, so pass them as a script
+                script_path = os.path.join(temp_dir, 'filters.txt')
+                with open(script_path, 'w', encoding='utf-8') as f:
+                    f.write(';\n'.join(filters))
+                graph_args = ['-filter_complex_script', script_path, '-map', f"[{last_label}]"]
+            else:
+                graph_args = ['-map', '0:v']
+            
+            encoder = _resolve_ffmpeg_encoder(self.config.get('ffmpeg_encoder', 'auto'))
+            # A hardware encoder can still fail mid-run (sessions, VRAM); libx264 is the fallback
+            for encoder in dict.fromkeys([encoder, 'libx264']):
+                cmd = ['ffmpeg', '-y', '-loglevel', 'error'] + inputs + graph_args + [
+                    '-map', '0:a?', '-c:a', 'copy',
+                ] + _ffmpeg_encoder_args(encoder, 18) + ['-pix_fmt', 'yuv420p']
+                if self.config.get('preview_mode'):
+                    cmd += ['-t', '10']
+                cmd.append(output_path)
+                
+                print(f"⚡ Encoding with ffmpeg/{encoder} ({len(overlay_segments)} subtitle overlays)")
+                result = subprocess.run(cmd)
+                if result.returncode == 0:
+                    break
+                print(f"⚠️  ffmpeg/{encoder} exited with code {result.returncode}")
+            
+        if result.returncode != 0:
+            print(f"❌ ffmpeg failed with exit code {result.returncode}")
             return False
+        return True
     
     def _generate_furigana_preview(self, text: str, max_chars: int = 30) -> str:
         """Generate a preview string showing furigana"""
-        furigana_chars = self.furigana_generator.generate_furigana(text)
+        line = self.furigana_generator.generate_furigana_line(text)
         
-        preview = ""
-        for char_info in furigana_chars:
-            if char_info.furigana:
-                preview += f"{char_info.char}({char_info.furigana})"
-            else:
-                preview += char_info.char
+        preview = ''.join(
+            f"{char}({furigana})" if furigana else char
+            for char, furigana in zip(line.chars, line.furigana)
+        )
         
         return preview[:max_chars] + "..." if len(preview) > max_chars else preview
     
-    def _add_subtitle_to_frame_safe(self, frame: np.ndarray, text: str, 
-                                   frame_width: int, frame_height: int, 
-                                   max_subtitle_width: int) -> np.ndarray:
-        """Safely add subtitle to frame with dimension checking"""
+    def _render_subtitle_overlay_cached(self, line: FuriganaLine, 
+                                        frame_width: int, frame_height: int, 
+                                        max_subtitle_width: int) -> Optional[Tuple[np.ndarray, int, int]]:
+        """Render through an on-disk cache of RGBA cues keyed by everything that shapes them"""
+        cache_dir = self.config.get('render_cache_dir')
+        if not cache_dir or not line:
+            return self._render_subtitle_overlay(line, frame_width, frame_height, max_subtitle_width)
+        
+        renderer = self.renderer
+        key_parts = (
+            RENDER_CACHE_VERSION, line.chars, line.furigana,
+            getattr(renderer.main_font, 'path', None), getattr(renderer.furigana_font, 'path', None),
+            renderer.main_font_size, renderer.furigana_font_size, renderer.furigana_spacing,
+            self.config['subtitle_position'], self.config['margin'], self.config['auto_scale'],
+            frame_width, frame_height, max_subtitle_width
+        )
+        key = hashlib.blake2b(repr(key_parts).encode('utf-8'), digest_size=16).hexdigest()
+        cache_path = os.path.join(os.path.expanduser(cache_dir), f"{key}.npz")
+        
+        if os.path.exists(cache_path):
+            try:
+                with np.load(cache_path) as cached:
+                    rendered = cached['image'], int(cached['x']), int(cached['y'])
+            except Exception as e:
+                print(f"⚠️  Ignoring unreadable render cache entry {cache_path}: {e}")
+            else:
+                try:
+                    os.utime(cache_path)  # Eviction drops the least recently used cues first
+                except OSError:
+                    pass
+                return rendered
+        
+        rendered = self._render_subtitle_overlay(line, frame_width, frame_height, max_subtitle_width)
+        if rendered:
+            # Only the glyphs' bounding box is stored; the padding is all zero alpha
+            rendered = _crop_to_coverage(*rendered)
+            image, x, y = rendered
+            temp_path = None
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                # Write aside and rename, so a concurrent run never reads a partial file
+                with tempfile.NamedTemporaryFile(dir=os.path.dirname(cache_path), suffix='.tmp',
+                                                 delete=False) as f:
+                    temp_path = f.name
+                    np.savez_compressed(f, image=image, x=x, y=y)
+                os.replace(temp_path, cache_path)
+            except OSError as e:
+                print(f"⚠️  Could not write render cache: {e}")
+                if temp_path and os.path.exists(temp_path):
+                    os.remove(temp_path)
+        return rendered
+    
+    def _trim_render_cache(self):
+        """Evict the least recently used cues until the cache fits RENDER_CACHE_MAX_BYTES"""
+        cache_dir = self.config.get('render_cache_dir')
+        if not cache_dir:
+            return
+        entries = []
+        for path in glob.glob(os.path.join(os.path.expanduser(cache_dir), '*.npz')):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Evicted by a concurrent run
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= RENDER_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+    
+    def _render_subtitle_overlay(self, line: FuriganaLine, 
+                                 frame_width: int, frame_height: int, 
+                                 max_subtitle_width: int) -> Optional[Tuple[np.ndarray, int, int]]:
+        """Render subtitle to an RGBA array and compute its safe frame position"""
         
-        # Generate furigana
-        furigana_chars = self.furigana_generator.generate_furigana(text)
-        if not furigana_chars:
-            return frame
+        if not line:
+            return None
         
-        # Measure subtitle size
+        # Measure subtitle size (the layout is reused by the renderer)
+        layout = self.renderer.layout_text_with_furigana(line)
         text_width, text_height = self.renderer.measure_text_with_furigana(
-            furigana_chars, max_subtitle_width
+            line, max_subtitle_width, layout
         )
         
         # Calculate scale factor if needed
@@ -691,14 +1466,6 @@ class CompleteFuriganaSubtitleBurner:
         subtitle_width = min(text_width + 2 * padding, frame_width - 20)
         subtitle_height = min(text_height + 2 * padding, frame_height // 4)
         
-        # Create subtitle image
-        subtitle_img = self.renderer.render_text_with_furigana(
-            furigana_chars, subtitle_width, subtitle_height, scale_factor
-        )
-        
-        # Convert PIL to OpenCV
-        subtitle_cv = cv2.cvtColor(np.array(subtitle_img), cv2.COLOR_RGBA2BGRA)
-        
         # Calculate safe position
         position = self.config['subtitle_position']
         margin = self.config['margin']
@@ -721,30 +1488,27 @@ class CompleteFuriganaSubtitleBurner:
         if (x + subtitle_width > frame_width or 
             y + subtitle_height > frame_height or
             subtitle_width <= 0 or subtitle_height <= 0):
-            print(f"⚠️  Subtitle dimensions unsafe, skipping")
-            return frame
+            log.debug("⚠️  Subtitle dimensions unsafe, skipping")
+            return None
+        
+        # Create subtitle image
+        subtitle_img = self.renderer.render_text_with_furigana(
+            line, subtitle_width, subtitle_height, scale_factor, layout
+        )
         
-        # Safe alpha blending
+        return np.asarray(subtitle_img), x, y
+    
+    def _blend_subtitle_overlay(self, frame: np.ndarray, 
+                                overlay: SubtitleOverlay) -> np.ndarray:
+        """Alpha blend a pre-rendered subtitle onto the frame in place"""
         try:
-            alpha = subtitle_cv[:subtitle_height, :subtitle_width, 3] / 255.0
-            alpha = np.stack([alpha] * 3, axis=2)
-            
-            overlay_region = frame[y:y+subtitle_height, x:x+subtitle_width]
-            subtitle_rgb = subtitle_cv[:subtitle_height, :subtitle_width, :3]
-            
-            # Ensure dimensions match
-            if (overlay_region.shape == subtitle_rgb.shape == alpha.shape):
-                blended = overlay_region * (1 - alpha) + subtitle_rgb * alpha
-                frame[y:y+subtitle_height, x:x+subtitle_width] = blended.astype(np.uint8)
-            else:
-                print(f"⚠️  Dimension mismatch: {overlay_region.shape} vs {subtitle_rgb.shape}")
+            _blend_overlay(frame, overlay)
         
         except Exception as e:
-            print(f"⚠️  Blending error: {e}")
+            log.warning(f"⚠️  Blending error: {e}")
         
         return frame
 
-
 def save_config(config: dict, config_path: str = "furigana_config.json"):
     """Save configuration to file"""
     try:
@@ -773,6 +1537,8 @@ def main():
     """Main function with improved argument handling"""
     import argparse
     
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     parser = argparse.ArgumentParser(description='Complete Furigana Subtitle Burner')
     parser.add_argument('video', nargs='?', help='Input video file')
     parser.add_argument('srt', nargs='?', help='Input SRT subtitle file')
@@ -782,6 +1548,13 @@ def main():
     parser.add_argument('--position', choices=['top', 'bottom', 'center'], default='bottom')
     parser.add_argument('--margin', type=int, default=80, help='Margin from edge')
     parser.add_argument('--preview', action='store_true', help='Preview mode (first 10 seconds)')
+    parser.add_argument('--no-hw-decode', action='store_true', help='Disable hardware video decoding')
+    parser.add_argument('--no-render-cache', action='store_true', help='Do not reuse rendered subtitles from disk')
+    parser.add_argument('--workers', type=int, default=1, help='Parallel worker processes (needs ffmpeg)')
+    parser.add_argument('--backend', choices=['opencv', 'ffmpeg'], default='opencv',
+                        help='Frame loop in OpenCV or overlay filter in ffmpeg')
+    parser.add_argument('--encoder', choices=['auto', 'libx264', 'h264_nvenc'], default='auto',
+                        help='Video encoder whenever ffmpeg encodes the output')
     parser.add_argument('--config', help='Configuration file path')
     parser.add_argument('--save-config', action='store_true', help='Save current config as default')
     
@@ -789,7 +1562,9 @@ def main():
         # Auto-detect mode
         print("🔍 Auto-detecting video and subtitle files...")
         
-        mp4_files = glob.glob("*.MP4") + glob.glob("*.mp4")
+        # One directory scan, case-insensitive (two globs list a file twice on macOS)
+        mp4_files = sorted(entry.name for entry in os.scandir('.') 
+                           if entry.is_file() and entry.name.lower().endswith('.mp4'))
         srt_files = glob.glob("*.srt")
         
         if mp4_files and srt_files:
@@ -834,7 +1609,12 @@ def main():
         'furigana_font_size': args.furigana_font_size,
         'subtitle_position': args.position,
         'margin': args.margin,
-        'preview_mode': args.preview
+        'preview_mode': args.preview,
+        'backend': args.backend,
+        'hw_decode': not args.no_hw_decode,
+        'workers': args.workers,
+        'ffmpeg_encoder': args.encoder,
+        'render_cache_dir': None if args.no_render_cache else '~/.cache/furigana'
     })
     
     # Save configuration if requested
@@ -68,14 +68,17 @@ def test_pykakasi():
 
 def test_basic_kanji_detection():
     print("\n=== Testing Basic Kanji Detection ===")
-    
-    def is_kanji(char):
-        return '\u4e00' <= char <= '\u9faf'
+    try:
+        # Same mask the burner uses (needs numpy, OpenCV and Pillow)
+        from complete_furigana_burner import kanji_mask
+    except ImportError as e:
+        print(f"❌ Burner dependencies not available: {e}")
+        return
     
     test_chars = ['今', '日', 'は', 'あ', 'A', '1', '。']
     
-    for char in test_chars:
-        kanji_status = "kanji" if is_kanji(char) else "not kanji"
+    for char, is_kanji in zip(test_chars, kanji_mask(''.join(test_chars))):
+        kanji_status = "kanji" if is_kanji else "not kanji"
         print(f"  '{char}' -> {kanji_status}")
     
     print("✅ Basic kanji detection working")
@@ -4,51 +4,81 @@ Test Japanese font rendering
 """
 
 from PIL import Image, ImageDraw, ImageFont
+import functools
 import os
+import subprocess
+
+# Size used for both probing and the test render, so probed faces are reused
+TEST_FONT_SIZE = 48
+
+@functools.lru_cache(maxsize=64)
+def _get_font(path, size):
+    """Open a FreeType face once per (path, size)"""
+    return ImageFont.truetype(path, size)
+
+# Fallback candidates where fontconfig is not available (macOS, Windows)
+KNOWN_FONT_PATHS = [
+    # macOS fonts
+    "/System/Library/Fonts/Hiragino Sans GB.ttc",
+    "/System/Library/Fonts/Hiragino Mincho ProN.otf",
+    "/Library/Fonts/Arial Unicode MS.ttf",
+    "/System/Library/Fonts/PingFang.ttc",
+    
+    # Linux fonts
+    "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
+    "/usr/share/fonts/truetype/fonts-japanese-mincho.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    
+    # Windows fonts
+    "/Windows/Fonts/msgothic.ttc",
+    "/Windows/Fonts/msmincho.ttc",
+    "/Windows/Fonts/meiryo.ttc",
+    "/Windows/Fonts/arial.ttf",
+    
+    # Ubuntu/Debian specific
+    "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/takao-gothic/TakaoPGothic.ttf",
+    "/usr/share/fonts/truetype/vlgothic/VL-Gothic-Regular.ttf",
+]
+
+def list_fontconfig_japanese_fonts():
+    """Ask fontconfig for every installed font covering Japanese (None if unavailable)"""
+    try:
+        result = subprocess.run(['fc-list', ':lang=ja', 'file'], capture_output=True, text=True)
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    
+    # Lines look like "/path/to/font.ttc: "; keep fontconfig's order, drop repeats
+    return list(dict.fromkeys(line.strip().rstrip(':') for line in result.stdout.splitlines() if line.strip()))
 
 def find_japanese_fonts():
     """Find all available Japanese fonts"""
     print("🔍 Searching for Japanese fonts...")
     
-    font_paths = [
-        # macOS fonts
-        "/System/Library/Fonts/Hiragino Sans GB.ttc",
-        "/System/Library/Fonts/Hiragino Mincho ProN.otf",
-        "/Library/Fonts/Arial Unicode MS.ttf",
-        "/System/Library/Fonts/PingFang.ttc",
-        
-        # Linux fonts
-        "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
-        "/usr/share/fonts/truetype/fonts-japanese-mincho.ttf",
-        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-        "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/usr/share/fonts/TTF/DejaVuSans.ttf",
-        
-        # Windows fonts
-        "/Windows/Fonts/msgothic.ttc",
-        "/Windows/Fonts/msmincho.ttc",
-        "/Windows/Fonts/meiryo.ttc",
-        "/Windows/Fonts/arial.ttf",
-        
-        # Ubuntu/Debian specific
-        "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
-        "/usr/share/fonts/truetype/takao-gothic/TakaoPGothic.ttf",
-        "/usr/share/fonts/truetype/vlgothic/VL-Gothic-Regular.ttf",
-    ]
+    # One fontconfig query replaces probing the hardcoded paths one by one
+    font_paths = list_fontconfig_japanese_fonts()
+    if font_paths:
+        print(f"📋 fontconfig reports {len(font_paths)} Japanese font file(s)")
+    else:
+        # No fontconfig, or it knows no Japanese font: probe the usual locations
+        font_paths = [path for path in KNOWN_FONT_PATHS if os.path.exists(path)]
     
     found_fonts = []
     
     for font_path in font_paths:
-        if os.path.exists(font_path):
-            try:
-                # Test if font can be loaded
-                test_font = ImageFont.truetype(font_path, 20)
-                found_fonts.append(font_path)
-                print(f"✅ Found: {font_path}")
-            except Exception as e:
-                print(f"❌ Failed to load: {font_path} - {e}")
+        try:
+            # Test if font can be loaded
+            _get_font(font_path, TEST_FONT_SIZE)
+            found_fonts.append(font_path)
+            print(f"✅ Found: {font_path}")
+        except Exception as e:
+            print(f"❌ Failed to load: {font_path} - {e}")
     
     return found_fonts
 
@@ -64,7 +94,7 @@ def test_font_rendering(font_path=None):
     
     try:
         if font_path and os.path.exists(font_path):
-            font = ImageFont.truetype(font_path, 48)
+            font = _get_font(font_path, TEST_FONT_SIZE)
         else:
             font = ImageFont.load_default()
         
@@ -16,9 +16,20 @@ import os
 import sys
 import glob
 import json
+import hashlib
+import functools
+import math
+import pickle
+import queue
+import sqlite3
+import threading
+import shutil
+import subprocess
+import tempfile
 from dataclasses import dataclass
 from typing import List, Tuple, Optional, Dict, Any
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 # Import the OpenAI request handler
 from openai_request import OpenAIRequestJSONBase
@@ -30,6 +41,70 @@ try:
 except ImportError:
     KAKASI_AVAILABLE = False
 
+try:
+    import fugashi
+    FUGASHI_AVAILABLE = True
+except ImportError:
+    FUGASHI_AVAILABLE = False
+
+# Faster JSON parsing/serialization when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# libavcodec decoding with frame threading
+try:
+    import av
+    PYAV_AVAILABLE = True
+except ImportError:
+    PYAV_AVAILABLE = False
+
+# Optional JIT for the per-frame blend kernel
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+try:
+    import chardet
+    CHARDET_AVAILABLE = True
+except ImportError:
+    CHARDET_AVAILABLE = False
+
+# BMP character classification table: one byte per code point, indexed by ord()
+CHAR_OTHER, CHAR_HIRAGANA, CHAR_KATAKANA, CHAR_KANJI = 0, 1, 2, 3
+CHAR_CLASS = bytearray(0x10000)
+CHAR_CLASS[0x3040:0x30A0] = bytes([CHAR_HIRAGANA]) * 0x60
+CHAR_CLASS[0x30A0:0x3100] = bytes([CHAR_KATAKANA]) * 0x60
+CHAR_CLASS[0x4E00:0x9FB0] = bytes([CHAR_KANJI]) * (0x9FB0 - 0x4E00)
+CHAR_CLASS = bytes(CHAR_CLASS)
+
+HIRAGANA_TAIL_RE = re.compile(r'[\u3040-\u309F]+$')
+NON_HIRAGANA_RE = re.compile(r'[^\u3040-\u309F、。！？]')
+NON_KATAKANA_RE = re.compile(r'[^\u30A0-\u30FF]')
+FALLBACK_SPLIT_RE = re.compile(r'([ \t\n、。！？，．])')
+
+# ァ..ヶ map onto ぁ..ゖ; marks like ー and ・ have no hiragana form and are kept
+KATA_TO_HIRA_TABLE = str.maketrans({chr(c): chr(c - 0x60) for c in range(0x30A1, 0x30F7)})
+
+# Grammatical cache entries are keyed by this version plus a digest of the text
+ANALYSIS_CACHE_VERSION = "v1"
+
+# Subtitle timestamp patterns, compiled once
+_BLOCK_SPLIT_RE = re.compile(r'\n\s*\n')
+_TS_RE = re.compile(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})')
+_SRT_TS_RE = re.compile(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}),(\d{3})')
+
+
+def char_class(char: str) -> int:
+    """Look up the Japanese script class of a single character"""
+    code = ord(char)
+    return CHAR_CLASS[code] if code < 0x10000 else CHAR_OTHER
+
 
 class GrammaticalType(Enum):
     """Grammatical types for Japanese components"""
@@ -52,6 +127,10 @@ class GrammaticalType(Enum):
     OTHER = "other"              # その他
 
 
+# Value string -> member, so unknown LLM labels fall back without raising
+GRAMMATICAL_TYPE_MAP = {t.value: t for t in GrammaticalType}
+
+
 @dataclass
 class GrammaticalWord:
     """Represents a word with grammatical analysis"""
@@ -61,6 +140,37 @@ class GrammaticalWord:
     color: Tuple[int, int, int]
 
 
+@dataclass
+class WordBatch:
+    """Structure-of-arrays view of one subtitle's words, colors derived in bulk"""
+    words: List[str]
+    furiganas: List[Optional[str]]
+    widths: List[int]
+    colors: List[Tuple[int, int, int]]
+    stroke_colors: List[Tuple[int, int, int]]
+    furigana_colors: List[Tuple[int, int, int]]
+    furigana_stroke_colors: List[Tuple[int, int, int]]
+    
+    @classmethod
+    def from_words(cls, words: List[GrammaticalWord], widths: np.ndarray) -> 'WordBatch':
+        colors = np.array([word.color for word in words], dtype=np.int32).reshape(-1, 3)
+        # Same arithmetic as GrammaticalColorScheme.lighten/stroke, for every word at once
+        furigana_colors = np.minimum(255, colors + (255 - colors) * 0.7).astype(np.int32)
+        
+        def as_tuples(array: np.ndarray) -> List[Tuple[int, int, int]]:
+            return [tuple(row) for row in array.tolist()]
+        
+        return cls(
+            words=[word.word for word in words],
+            furiganas=[word.furigana for word in words],
+            widths=widths.tolist(),
+            colors=as_tuples(colors),
+            stroke_colors=as_tuples(colors // 3),
+            furigana_colors=as_tuples(furigana_colors),
+            furigana_stroke_colors=as_tuples(furigana_colors // 3),
+        )
+
+
 @dataclass
 class SubtitleSegment:
     start_time: float
@@ -68,6 +178,12 @@ class SubtitleSegment:
     text: str
     lang: Optional[str] = None
     grammatical_words: Optional[List[GrammaticalWord]] = None
+    # Pre-rendered subtitle planes (uint16 bgr*a+128 and 255-a) and placement, filled before burning
+    overlay_premultiplied: Optional[np.ndarray] = None
+    overlay_inv_alpha: Optional[np.ndarray] = None
+    overlay_xy: Optional[Tuple[int, int]] = None
+    # (premultiplied, inverse alpha) per Y/U/V plane when blending in yuv420p
+    overlay_yuv: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None
 
 
 @dataclass
@@ -84,6 +200,15 @@ class BurnerConfig:
     furigana_spacing_ratio: float = 0.3
     openai_model: str = "gpt-4o-mini"
     max_openai_retries: int = 3
+    max_concurrent_requests: int = 8  # Parallel OpenAI calls when analyzing a whole file
+    analysis_batch_size: int = 20  # Sentences per OpenAI call when analyzing a whole file (1 = one call per line)
+    analysis_db: str = 'grammatical_cache/analysis.sqlite'  # Persistent line -> words cache ('' = disabled)
+    prefer_local_analysis: bool = True  # Try fugashi first, OpenAI only for ambiguous lines
+    render_workers: int = 0  # Processes for pre-rendering subtitles (0 = all CPUs, 1 = serial)
+    ffmpeg_encoder: str = 'auto'  # 'auto' = h264_nvenc when available, else libx264
+    video_decoder: str = 'auto'  # 'auto' = PyAV when installed, 'opencv' = cv2.VideoCapture
+    blend_in_yuv: bool = True  # Keep PyAV->ffmpeg frames in yuv420p instead of converting to BGR
+    burn_backend: str = 'python'  # 'ffmpeg' = composite pre-rendered subtitle PNGs with ffmpeg's overlay filter
     force_refresh: bool = False  # True = ignore cache, False = use cache
 
 
@@ -110,9 +235,148 @@ class GrammaticalColorScheme:
         GrammaticalType.OTHER: (220, 220, 220),        # Very light gray
     }
     
+    # Derived furigana and outline colors, filled once by _init_derived()
+    LIGHTENED_MAP: Dict[GrammaticalType, Tuple[int, int, int]] = {}
+    STROKE_MAP: Dict[Tuple[int, int, int], Tuple[int, int, int]] = {}
+    
     @classmethod
     def get_color(cls, grammatical_type: GrammaticalType) -> Tuple[int, int, int]:
         return cls.COLOR_MAP.get(grammatical_type, cls.COLOR_MAP[GrammaticalType.OTHER])
+    
+    @staticmethod
+    def lighten(color: Tuple[int, int, int], factor: float = 0.7) -> Tuple[int, int, int]:
+        return tuple(min(255, int(c + (255 - c) * factor)) for c in color)
+    
+    @staticmethod
+    def stroke(color: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        return tuple(max(0, c // 3) for c in color)
+    
+    @classmethod
+    def _init_derived(cls):
+        for grammatical_type, color in cls.COLOR_MAP.items():
+            lightened = cls.lighten(color)
+            cls.LIGHTENED_MAP[grammatical_type] = lightened
+            cls.STROKE_MAP[color] = cls.stroke(color)
+            cls.STROKE_MAP[lightened] = cls.stroke(lightened)
+
+
+GrammaticalColorScheme._init_derived()
+
+
+@functools.lru_cache(maxsize=1)
+def _fugashi_tagger():
+    """Load the fugashi tagger (and its unidic dictionary) once per process"""
+    return fugashi.Tagger()
+
+
+class LocalGrammaticalAnalyzer:
+    """MeCab (fugashi) morphology mapped onto the grammatical types, no network"""
+    
+    POS_MAP = {
+        "名詞": GrammaticalType.NOUN,
+        "代名詞": GrammaticalType.NOUN,
+        "接頭辞": GrammaticalType.NOUN,
+        "接尾辞": GrammaticalType.NOUN,
+        "動詞": GrammaticalType.VERB,
+        "形容詞": GrammaticalType.ADJECTIVE,
+        "形状詞": GrammaticalType.ADJECTIVE,
+        "連体詞": GrammaticalType.ADJECTIVE,
+        "副詞": GrammaticalType.ADVERB,
+        "助動詞": GrammaticalType.AUXILIARY,
+        "接続詞": GrammaticalType.CONJUNCTION,
+        "感動詞": GrammaticalType.OTHER,
+        "補助記号": GrammaticalType.PUNCTUATION,
+        "記号": GrammaticalType.PUNCTUATION,
+    }
+    
+    PARTICLE_MAP = {
+        "は": GrammaticalType.PARTICLE_WA,
+        "が": GrammaticalType.PARTICLE_GA,
+        "を": GrammaticalType.PARTICLE_WO,
+        "に": GrammaticalType.PARTICLE_NI,
+        "で": GrammaticalType.PARTICLE_DE,
+        "と": GrammaticalType.PARTICLE_TO,
+    }
+    
+    def __init__(self):
+        self.tagger = _fugashi_tagger()
+    
+    def analyze(self, text: str) -> Optional[List[Dict[str, str]]]:
+        """Return word/furigana/type dicts, or None when the line needs the LLM"""
+        words_data = []
+        
+        for token in self.tagger(text):
+            surface = token.surface
+            pos = token.feature.pos1
+            
+            if pos == "空白":
+                continue
+            if getattr(token, 'is_unk', False):
+                return None
+            
+            if pos == "助詞":
+                grammatical_type = self.PARTICLE_MAP.get(surface, GrammaticalType.PARTICLE_OTHER)
+            elif pos in self.POS_MAP:
+                grammatical_type = self.POS_MAP[pos]
+            else:
+                return None
+            
+            kana = getattr(token.feature, 'kana', None) or getattr(token.feature, 'reading', None)
+            if not kana or kana == '*':
+                if any(char_class(c) == CHAR_KANJI for c in surface):
+                    return None
+                kana = surface
+            
+            words_data.append({
+                "word": surface,
+                "furigana": kana.translate(KATA_TO_HIRA_TABLE),
+                "type": grammatical_type.value
+            })
+        
+        return words_data or None
+
+
+class AnalysisCache:
+    """SQLite store of OpenAI-analyzed lines, keyed by a digest of (version, model, lang, text)"""
+    
+    # Stays under SQLite's default bound-parameter limit
+    _LOOKUP_CHUNK = 500
+    
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Shared by the analysis threads; the lock serializes access
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS kv (k BLOB PRIMARY KEY, v BLOB)')
+            self._db.commit()
+    
+    @staticmethod
+    def key(text: str, lang: Optional[str], model: str) -> bytes:
+        # 'openai' keeps rows from before local results stopped being stored unreachable
+        data = '\0'.join((ANALYSIS_CACHE_VERSION, 'openai', model, lang or '', text)).encode('utf-8')
+        return hashlib.blake2b(data, digest_size=8).digest()
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, List[GrammaticalWord]]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), self._LOOKUP_CHUNK):
+                chunk = keys[i:i + self._LOOKUP_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                for k, v in self._db.execute(f'SELECT k, v FROM kv WHERE k IN ({placeholders})', chunk):
+                    try:
+                        found[k] = pickle.loads(v)
+                    except Exception:
+                        pass  # Written by an incompatible version; re-analyzed and overwritten
+        return found
+    
+    def put_many(self, items: List[Tuple[bytes, List[GrammaticalWord]]]):
+        if not items:
+            return
+        rows = [(k, pickle.dumps(words, protocol=pickle.HIGHEST_PROTOCOL)) for k, words in items]
+        with self._lock, self._db:
+            self._db.executemany('INSERT OR REPLACE INTO kv (k, v) VALUES (?, ?)', rows)
 
 
 class SimpleGrammaticalAnalyzer:
@@ -132,6 +396,14 @@ class SimpleGrammaticalAnalyzer:
             print(f"❌ Failed to initialize OpenAI client: {e}")
             self.openai_client = None
         
+        self.local_analyzer = None
+        if config.prefer_local_analysis and FUGASHI_AVAILABLE:
+            try:
+                self.local_analyzer = LocalGrammaticalAnalyzer()
+                print("✅ Local fugashi analysis enabled (OpenAI for ambiguous lines)")
+            except Exception as e:
+                print(f"⚠️ Fugashi unavailable, using OpenAI only: {e}")
+        
         # Simplified schema - just word, furigana, type
         self.analysis_schema = {
             "type": "object",
@@ -161,20 +433,131 @@ class SimpleGrammaticalAnalyzer:
             "required": ["words"],
             "additionalProperties": False
         }
+        
+        # Several sentences per request, each tagged with its position in the prompt
+        self.batch_schema = {
+            "type": "object",
+            "properties": {
+                "sentences": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "index": {"type": "integer"},
+                            "words": self.analysis_schema["properties"]["words"]
+                        },
+                        "required": ["index", "words"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["sentences"],
+            "additionalProperties": False
+        }
+        
+        self.analysis_cache = None
+        if config.analysis_db:
+            try:
+                self.analysis_cache = AnalysisCache(config.analysis_db)
+            except (sqlite3.Error, OSError) as e:
+                print(f"⚠️ Analysis cache unavailable: {e}")
+        # Successful analyses waiting to be written in one transaction
+        self._unsaved = []
+        self._unsaved_lock = threading.Lock()
+        
+        # In-memory memo for repeated lines, so repeats skip the disk cache entirely
+        self._analyze_sentence_cached = functools.lru_cache(maxsize=4096)(self._analyze_sentence)
     
     def analyze_sentence(self, text: str, lang_hint: Optional[str] = None) -> List[GrammaticalWord]:
         """Analyze Japanese sentence with simplified prompt"""
         
-        if not text or not self.openai_client:
+        if self.config.force_refresh:
+            words = self._analyze_sentence(text, lang_hint)
+        else:
+            words = self._analyze_sentence_cached(text, lang_hint)
+        self._save_analyzed()
+        return words
+    
+    def _analyze_sentence(self, text: str, lang_hint: Optional[str] = None) -> List[GrammaticalWord]:
+        if self.analysis_cache and not self.config.force_refresh:
+            key = AnalysisCache.key(text, lang_hint, self.config.openai_model)
+            words = self.analysis_cache.get_many([key]).get(key)
+            if words is not None:
+                return words
+        
+        words = self._analyze_without_request(text, lang_hint)
+        if words is not None:
+            return words
+        
+        try:
+            # Single request call; force refresh skips the lookup but overwrites the entry
+            result = self.openai_client.send_request_with_json_schema(
+                prompt=self._sentence_prompt(text),
+                json_schema=self.analysis_schema,
+                filename=self._sentence_cache_key(text),
+                schema_name="simple_analysis",
+                model=self.config.openai_model,
+                bypass_cache=self.config.force_refresh
+            )
+            
+            if result and 'words' in result:
+                return self._remember(text, lang_hint, self._process_simple_result(result['words']))
+            else:
+                return self._create_fallback_words(text)
+                
+        except Exception as e:
+            print(f"⚠️ Analysis error: {e}")
+            return self._create_fallback_words(text)
+    
+    def _remember(self, text: str, lang_hint: Optional[str], words: List[GrammaticalWord]) -> List[GrammaticalWord]:
+        """Queue a successful OpenAI analysis for the persistent cache
+        
+        Local and fallback words are never stored: the key names the OpenAI model, and
+        local analysis is cheap to redo.
+        """
+        if self.analysis_cache:
+            with self._unsaved_lock:
+                self._unsaved.append((AnalysisCache.key(text, lang_hint, self.config.openai_model), words))
+        return words
+    
+    def _save_analyzed(self):
+        """Write every queued analysis in one transaction"""
+        if not self.analysis_cache:
+            return
+        with self._unsaved_lock:
+            items, self._unsaved = self._unsaved, []
+        try:
+            self.analysis_cache.put_many(items)
+        except sqlite3.Error as e:
+            print(f"⚠️ Analysis cache write error: {e}")
+    
+    def _analyze_without_request(self, text: str, lang_hint: Optional[str] = None) -> Optional[List[GrammaticalWord]]:
+        """Words for lines that need no OpenAI call (empty, non-Japanese, local analysis), else None"""
+        if not text:
             return self._create_fallback_words(text)
         
         # Check language
         if lang_hint and lang_hint.lower() not in ['ja', 'japanese', 'jpn']:
             return self._create_fallback_words(text)
         
-        try:
-            # Simple, direct prompt
-            prompt = f"""Analyze this Japanese text: "{text}"
+        # Local morphology covers most lines without a network round-trip
+        if self.local_analyzer:
+            try:
+                words_data = self.local_analyzer.analyze(text)
+                if words_data is not None:
+                    return self._process_simple_result(words_data)
+            except Exception as e:
+                print(f"⚠️ Local analysis error: {e}")
+        
+        if not self.openai_client:
+            return self._create_fallback_words(text)
+        
+        return None
+    
+    @staticmethod
+    def _sentence_prompt(text: str) -> str:
+        # Simple, direct prompt
+        return f"""Analyze this Japanese text: "{text}"
 
 Break into words with:
 1. word: the word/particle  
@@ -188,33 +571,111 @@ Examples:
 - です → {{"word": "です", "furigana": "です", "type": "auxiliary"}}
 
 CRITICAL: Always provide furigana for every word, even hiragana ones."""
-
-            # Handle force refresh by changing cache filename
-            if self.config.force_refresh:
-                # Use timestamp to force fresh request but still cache result
-                import time
-                cache_key = f"simple_{abs(hash(text))}_{int(time.time())}.json"
+    
+    @staticmethod
+    def _sentence_cache_key(text: str) -> str:
+        # Stable across runs (built-in hash() is salted per process); bump the
+        # version when the prompt or schema changes
+        text_digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+        return f"simple_{ANALYSIS_CACHE_VERSION}_{text_digest}.json"
+    
+    def analyze_batch(self, texts: List[str], langs: List[Optional[str]]) -> List[List[GrammaticalWord]]:
+        """Analyze every unique (text, lang) once, sending the lines that need OpenAI in shared requests"""
+        
+        keys = list(zip(texts, langs))
+        unique_keys = list(dict.fromkeys(keys))
+        results = {}
+        pending = []
+        
+        # Lines seen in any earlier run skip morphology and OpenAI altogether
+        if self.analysis_cache and not self.config.force_refresh:
+            model = self.config.openai_model
+            db_keys = {key: AnalysisCache.key(key[0], key[1], model) for key in unique_keys}
+            stored = self.analysis_cache.get_many(list(db_keys.values()))
+            for key, db_key in db_keys.items():
+                if db_key in stored:
+                    results[key] = stored[db_key]
+            if results:
+                print(f"💾 {len(results)}/{len(unique_keys)} lines from the analysis cache")
+        
+        for key in unique_keys:
+            if key in results:
+                continue
+            words = self._analyze_without_request(*key)
+            if words is None and not self.config.force_refresh:
+                # Lines analyzed before (alone or in a batch) keep their per-line cache file
+                text = key[0]
+                cached = self.openai_client.load_from_cache(self._sentence_prompt(text),
+                                                            filename=self._sentence_cache_key(text))
+                if cached and 'words' in cached:
+                    words = self._remember(text, key[1], self._process_simple_result(cached['words']))
+            if words is None:
+                pending.append(key)
             else:
-                # Normal cache filename
-                cache_key = f"simple_{abs(hash(text))}.json"
+                results[key] = words
+        
+        if pending:
+            batch_size = max(1, self.config.analysis_batch_size)
+            batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            print(f"🤖 {len(pending)} lines need OpenAI: {len(batches)} requests")
             
-            # Single request call
-            result = self.openai_client.send_request_with_json_schema(
-                prompt=prompt,
-                json_schema=self.analysis_schema,
-                filename=cache_key,
-                schema_name="simple_analysis",
-                model=self.config.openai_model
-            )
+            # Each call is network-bound, so threads overlap the round-trips
+            with ThreadPoolExecutor(max_workers=max(1, self.config.max_concurrent_requests)) as pool:
+                for batch_results in pool.map(self._analyze_request_batch, batches):
+                    results.update(batch_results)
+        
+        self._save_analyzed()
+        return [results[key] for key in keys]
+    
+    def _analyze_request_batch(self, keys: List[Tuple[str, Optional[str]]]) -> Dict[Tuple[str, Optional[str]], List[GrammaticalWord]]:
+        """One OpenAI call for several lines; lines missing or garbled in the reply are retried alone"""
+        
+        results = {}
+        if len(keys) > 1:
+            texts = [text for text, _ in keys]
+            prompt = f"""Analyze each of these Japanese sentences (JSON array, 0-based index): {json.dumps(texts, ensure_ascii=False)}
+
+For each sentence return its index and its words, with:
+1. word: the word/particle  
+2. furigana: complete reading (ALWAYS provide, even for hiragana)
+3. type: grammatical type
+
+The words of a sentence must concatenate back to that sentence.
+
+CRITICAL: Always provide furigana for every word, even hiragana ones."""
             
-            if result and 'words' in result:
-                return self._process_simple_result(result['words'])
-            else:
-                return self._create_fallback_words(text)
+            batch_digest = hashlib.blake2b('\n'.join(texts).encode('utf-8'), digest_size=8).hexdigest()
+            try:
+                result = self.openai_client.send_request_with_json_schema(
+                    prompt=prompt,
+                    json_schema=self.batch_schema,
+                    filename=f"simple_batch_{ANALYSIS_CACHE_VERSION}_{batch_digest}.json",
+                    schema_name="simple_batch_analysis",
+                    model=self.config.openai_model,
+                    bypass_cache=self.config.force_refresh
+                )
                 
-        except Exception as e:
-            print(f"⚠️ Analysis error: {e}")
-            return self._create_fallback_words(text)
+                for item in (result or {}).get('sentences', []):
+                    index = item.get('index')
+                    words_data = item.get('words')
+                    if not isinstance(index, int) or not 0 <= index < len(keys) or not words_data:
+                        continue
+                    text = texts[index]
+                    joined = "".join(word_data.get('word', '') for word_data in words_data)
+                    if re.sub(r'\s', '', joined) != re.sub(r'\s', '', text):
+                        continue
+                    
+                    results[keys[index]] = self._remember(text, keys[index][1], self._process_simple_result(words_data))
+                    # Same entry a single-line request would have written
+                    self.openai_client.save_to_cache(self._sentence_prompt(text), {"words": words_data},
+                                                     filename=self._sentence_cache_key(text))
+            except Exception as e:
+                print(f"⚠️ Batch analysis error: {e}")
+        
+        for key in keys:
+            if key not in results:
+                results[key] = self.analyze_sentence(*key)
+        return results
     
     def _process_simple_result(self, words_data: List[Dict]) -> List[GrammaticalWord]:
         """Process simple result with intelligent post-processing"""
@@ -230,13 +691,10 @@ CRITICAL: Always provide furigana for every word, even hiragana ones."""
                 continue
             
             # Convert to enum
-            try:
-                grammatical_type = GrammaticalType(type_str)
-            except ValueError:
-                grammatical_type = GrammaticalType.OTHER
+            grammatical_type = GRAMMATICAL_TYPE_MAP.get(type_str, GrammaticalType.OTHER)
             
-            # Get color
-            color = GrammaticalColorScheme.get_color(grammatical_type)
+            # Get color (COLOR_MAP covers every type)
+            color = GrammaticalColorScheme.COLOR_MAP[grammatical_type]
             
             # POST-PROCESSING: Clean up furigana
             cleaned_furigana = self._post_process_furigana(word, furigana)
@@ -285,17 +743,12 @@ CRITICAL: Always provide furigana for every word, even hiragana ones."""
     def _remove_matching_suffix(self, word: str, furigana: str) -> str:
         """Remove matching hiragana suffix from furigana"""
         
-        # Find common suffix
-        word_rev = word[::-1]
-        furigana_rev = furigana[::-1]
+        # Only the word's trailing hiragana (okurigana) can be shared with the reading
+        match = HIRAGANA_TAIL_RE.search(word)
+        if not match:
+            return furigana
         
-        common_len = 0
-        for i in range(min(len(word_rev), len(furigana_rev))):
-            if (word_rev[i] == furigana_rev[i] and 
-                self._is_hiragana(word_rev[i])):
-                common_len += 1
-            else:
-                break
+        common_len = len(os.path.commonprefix([match.group(0)[::-1], furigana[::-1]]))
         
         if common_len > 0:
             return furigana[:-common_len] if common_len < len(furigana) else furigana
@@ -309,8 +762,9 @@ CRITICAL: Always provide furigana for every word, even hiragana ones."""
             return False
         
         # Check for kanji followed by hiragana
-        has_kanji = any(self._is_kanji(c) for c in word)
-        has_hiragana = any(self._is_hiragana(c) for c in word)
+        classes = {char_class(c) for c in word}
+        has_kanji = CHAR_KANJI in classes
+        has_hiragana = CHAR_HIRAGANA in classes
         
         return has_kanji and has_hiragana and len(furigana) < len(word) * 3  # Reasonable limit
     
@@ -354,60 +808,42 @@ CRITICAL: Always provide furigana for every word, even hiragana ones."""
         )]
     
     def _is_all_hiragana(self, text: str) -> bool:
-        return all(self._is_hiragana(c) or c in '、。！？' for c in text)
+        return NON_HIRAGANA_RE.search(text) is None
     
     def _is_all_katakana(self, text: str) -> bool:
-        return all(self._is_katakana(c) for c in text)
+        return NON_KATAKANA_RE.search(text) is None
     
     def _is_hiragana(self, char: str) -> bool:
-        return '\u3040' <= char <= '\u309f'
+        return char_class(char) == CHAR_HIRAGANA
     
     def _is_katakana(self, char: str) -> bool:
-        return '\u30a0' <= char <= '\u30ff'
+        return char_class(char) == CHAR_KATAKANA
     
     def _is_kanji(self, char: str) -> bool:
-        return '\u4e00' <= char <= '\u9faf'
+        return char_class(char) == CHAR_KANJI
     
     def _katakana_to_hiragana(self, katakana_text: str) -> str:
-        result = ""
-        for char in katakana_text:
-            if self._is_katakana(char):
-                result += chr(ord(char) - 0x60)
-            else:
-                result += char
-        return result
+        return katakana_text.translate(KATA_TO_HIRA_TABLE)
     
     def _create_fallback_words(self, text: str) -> List[GrammaticalWord]:
         """Create fallback words when AI fails"""
         words = []
-        current_word = ""
-        
-        for char in text:
-            if char in ' \t\n、。！？，．':
-                if current_word:
-                    words.append(GrammaticalWord(
-                        word=current_word,
-                        furigana=None,
-                        grammatical_type=GrammaticalType.OTHER,
-                        color=GrammaticalColorScheme.get_color(GrammaticalType.OTHER)
-                    ))
-                    current_word = ""
-                if char.strip():
-                    words.append(GrammaticalWord(
-                        word=char,
-                        furigana=None,
-                        grammatical_type=GrammaticalType.PUNCTUATION,
-                        color=GrammaticalColorScheme.get_color(GrammaticalType.PUNCTUATION)
-                    ))
-            else:
-                current_word += char
         
-        if current_word:
+        # The capture group keeps separators as their own parts
+        for part in FALLBACK_SPLIT_RE.split(text):
+            if not part:
+                continue
+            if FALLBACK_SPLIT_RE.fullmatch(part):
+                if not part.strip():
+                    continue
+                grammatical_type = GrammaticalType.PUNCTUATION
+            else:
+                grammatical_type = GrammaticalType.OTHER
             words.append(GrammaticalWord(
-                word=current_word,
+                word=part,
                 furigana=None,
-                grammatical_type=GrammaticalType.OTHER,
-                color=GrammaticalColorScheme.get_color(GrammaticalType.OTHER)
+                grammatical_type=grammatical_type,
+                color=GrammaticalColorScheme.COLOR_MAP[grammatical_type]
             ))
         
         return words
@@ -418,30 +854,53 @@ class SubtitleParser:
     
     @staticmethod
     def parse_subtitles(file_path: str) -> List[SubtitleSegment]:
-        encodings = ['utf-8', 'utf-8-sig', 'shift_jis', 'euc-jp', 'cp932']
+        try:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        except OSError as e:
+            print(f"❌ Could not read file: {file_path} ({e})")
+            return []
+        
+        content = SubtitleParser._decode(raw)
+        if content is None:
+            print(f"❌ Could not decode file: {file_path}")
+            return []
         
-        for encoding in encodings:
+        content = content.strip()
+        if file_path.lower().endswith('.json') or content.startswith('['):
+            return SubtitleParser.parse_json_content(content)
+        else:
+            return SubtitleParser.parse_srt_content(content)
+    
+    @staticmethod
+    def _decode(raw: bytes) -> Optional[str]:
+        """Decode subtitle bytes: BOM, then UTF-8, then detected or common Japanese encodings"""
+        if raw.startswith(b'\xef\xbb\xbf'):
+            return raw[3:].decode('utf-8', errors='replace')
+        
+        try:
+            return raw.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+        
+        candidates = ['shift_jis', 'euc-jp', 'cp932']
+        if CHARDET_AVAILABLE:
+            detected = chardet.detect(raw[:4096]).get('encoding')
+            if detected:
+                candidates.insert(0, detected)
+        
+        for encoding in candidates:
             try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read().strip()
-                
-                if file_path.lower().endswith('.json') or content.startswith('['):
-                    return SubtitleParser.parse_json_content(content)
-                else:
-                    return SubtitleParser.parse_srt_content(content)
-                    
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
+                return raw.decode(encoding)
+            except (UnicodeDecodeError, LookupError):
                 continue
         
-        print(f"❌ Could not decode file: {file_path}")
-        return []
+        return None
     
     @staticmethod
     def parse_json_content(content: str) -> List[SubtitleSegment]:
         try:
-            data = json.loads(content)
+            data = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
             segments = []
             
             for item in data:
@@ -472,7 +931,7 @@ class SubtitleParser:
     @staticmethod
     def parse_srt_content(content: str) -> List[SubtitleSegment]:
         segments = []
-        blocks = re.split(r'\n\s*\n', content.strip())
+        blocks = _BLOCK_SPLIT_RE.split(content.strip())
         
         for block in blocks:
             try:
@@ -481,16 +940,14 @@ class SubtitleParser:
                     continue
                 
                 timestamp_line = lines[1]
-                match = re.match(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}),(\d{3})', 
-                               timestamp_line)
+                match = _SRT_TS_RE.match(timestamp_line)
                 
                 if not match:
                     continue
                 
-                start_time = (int(match.group(1)) * 3600 + int(match.group(2)) * 60 + 
-                             int(match.group(3)) + int(match.group(4)) / 1000)
-                end_time = (int(match.group(5)) * 3600 + int(match.group(6)) * 60 + 
-                           int(match.group(7)) + int(match.group(8)) / 1000)
+                groups = match.groups()
+                start_time = SubtitleParser._parse_srt_timestamp(groups[:4])
+                end_time = SubtitleParser._parse_srt_timestamp(groups[4:])
                 
                 text = ' '.join(lines[2:]).strip()
                 if text:
@@ -502,14 +959,18 @@ class SubtitleParser:
         print(f"📝 Parsed {len(segments)} SRT segments")
         return segments
     
+    @staticmethod
+    def _parse_srt_timestamp(groups) -> float:
+        hours, minutes, seconds, milliseconds = map(int, groups)
+        return hours * 3600 + minutes * 60 + seconds + milliseconds / 1000
+    
     @staticmethod
     def _parse_timestamp(timestamp_str: str) -> Optional[float]:
         try:
             if ',' in timestamp_str:
-                match = re.match(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})', timestamp_str)
+                match = _TS_RE.match(timestamp_str)
                 if match:
-                    return (int(match.group(1)) * 3600 + int(match.group(2)) * 60 + 
-                           int(match.group(3)) + int(match.group(4)) / 1000)
+                    return SubtitleParser._parse_srt_timestamp(match.groups())
             else:
                 parts = timestamp_str.split(':')
                 if len(parts) == 3:
@@ -524,6 +985,29 @@ class SubtitleParser:
             return None
 
 
+FONT_PATHS = [
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
+    "/usr/share/fonts/truetype/takao-gothic/TakaoPGothic.ttf",
+    "/usr/share/fonts/truetype/vlgothic/VL-Gothic-Regular.ttf",
+    "/System/Library/Fonts/Hiragino Sans GB.ttc",
+    "/Windows/Fonts/msgothic.ttc",
+]
+
+# First font path that loaded, so later renderers skip the filesystem probe
+_FONT_PATH_CACHE: Optional[str] = None
+
+
+@functools.lru_cache(maxsize=8)
+def _load_font_cached(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(path, size)
+
+
+# Scratch canvas for text measurement, shared by every renderer
+_TEMP_IMG = Image.new('RGB', (1, 1))
+_TEMP_DRAW = ImageDraw.Draw(_TEMP_IMG)
+
+
 class GrammaticalRenderer:
     """Renderer for grammatical analysis with fixed colors"""
     
@@ -531,21 +1015,24 @@ class GrammaticalRenderer:
         self.config = config
         self.main_font = self._load_font(config.main_font_size)
         self.furigana_font = self._load_font(config.furigana_font_size)
+        # Width memo; subtitles repeat across many frames
+        self._width_cache: Dict[Tuple[str, int], int] = {}
+        # Rendered subtitle per (word content, frame size); a segment spans many frames
+        self._subtitle_cache: Dict[Tuple[Any, ...], Image.Image] = {}
     
     def _load_font(self, size: int) -> ImageFont.FreeTypeFont:
-        font_paths = [
-            "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-            "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
-            "/usr/share/fonts/truetype/takao-gothic/TakaoPGothic.ttf",
-            "/usr/share/fonts/truetype/vlgothic/VL-Gothic-Regular.ttf",
-            "/System/Library/Fonts/Hiragino Sans GB.ttc",
-            "/Windows/Fonts/msgothic.ttc",
-        ]
+        global _FONT_PATH_CACHE
         
-        for font_path in font_paths:
+        if _FONT_PATH_CACHE:
+            return _load_font_cached(_FONT_PATH_CACHE, size)
+        
+        # First call walks the candidates; the path that loads is remembered
+        for font_path in FONT_PATHS:
             try:
                 if os.path.exists(font_path):
-                    return ImageFont.truetype(font_path, size)
+                    font = _load_font_cached(font_path, size)
+                    _FONT_PATH_CACHE = font_path
+                    return font
             except:
                 continue
         
@@ -556,39 +1043,90 @@ class GrammaticalRenderer:
         if not words:
             return Image.new('RGBA', (100, 50), (0, 0, 0, 0))
         
-        total_width, total_height = self._calculate_dimensions(words)
+        cache_key = self._cache_key(words, frame_width, frame_height)
+        cached = self._subtitle_cache.get(cache_key)
+        if cached is None:
+            cached = self._subtitle_cache[cache_key] = self._render_uncached(words, frame_width, frame_height)
+        return cached
+    
+    @staticmethod
+    def _cache_key(words: List[GrammaticalWord], frame_width: int, frame_height: int) -> Tuple[Any, ...]:
+        return (tuple((word.word, word.furigana, word.color) for word in words), frame_width, frame_height)
+    
+    def prerender(self, word_lists: List[List[GrammaticalWord]], frame_width: int, frame_height: int):
+        """Fill the subtitle cache for every distinct word list, across processes when allowed"""
+        pending = {}
+        for words in word_lists:
+            if words:
+                key = self._cache_key(words, frame_width, frame_height)
+                if key not in self._subtitle_cache:
+                    pending.setdefault(key, words)
+        
+        if not pending:
+            return
+        
+        workers = self.config.render_workers or os.cpu_count() or 1
+        workers = min(workers, len(pending))
+        
+        if workers > 1:
+            try:
+                # Each worker builds its own renderer (fonts are loaded per process)
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                         initargs=(self.config,)) as pool:
+                    images = pool.map(_render_in_worker, pending.values(),
+                                      [frame_width] * len(pending), [frame_height] * len(pending),
+                                      chunksize=max(1, len(pending) // (workers * 4)))
+                    self._subtitle_cache.update(zip(pending.keys(), images))
+                return
+            except Exception as e:
+                print(f"⚠️ Parallel pre-render failed, rendering serially: {e}")
+        
+        for key, words in pending.items():
+            if key not in self._subtitle_cache:
+                self._subtitle_cache[key] = self._render_uncached(words, frame_width, frame_height)
+    
+    def _render_uncached(self, words: List[GrammaticalWord], 
+                         frame_width: int, frame_height: int) -> Image.Image:
+        # Measure every word once; layout and drawing below reuse these widths
+        widths = self._measure_words(words)
+        total_width, total_height = int(widths.sum()), self._line_height(words)
         max_width = int(frame_width * self.config.max_width_ratio)
         
         if total_width > max_width and self.config.auto_multi_line:
-            return self._render_multi_line(words, frame_width, frame_height, max_width)
+            return self._render_multi_line(words, frame_width, frame_height, max_width, widths, total_height)
         else:
-            return self._render_single_line(words, frame_width, frame_height)
+            return self._render_single_line(words, frame_width, frame_height, widths, total_width, total_height)
+    
+    def _measure(self, text: str, font: ImageFont.FreeTypeFont) -> int:
+        key = (text, id(font))
+        width = self._width_cache.get(key)
+        if width is None:
+            bbox = _TEMP_DRAW.textbbox((0, 0), text, font=font)
+            width = self._width_cache[key] = bbox[2] - bbox[0]
+        return width
+    
+    def _measure_words(self, words: List[GrammaticalWord]) -> np.ndarray:
+        return np.fromiter((self._get_word_width(word) for word in words), dtype=np.int32, count=len(words))
+    
+    def _line_height(self, words: List[GrammaticalWord]) -> int:
+        if any(word.furigana for word in words):
+            return (self.config.main_font_size + self.config.furigana_font_size + 
+                    int(self.config.furigana_font_size * self.config.furigana_spacing_ratio))
+        return self.config.main_font_size
     
     def _calculate_dimensions(self, words: List[GrammaticalWord]) -> Tuple[int, int]:
-        temp_img = Image.new('RGB', (1, 1))
-        temp_draw = ImageDraw.Draw(temp_img)
-        
-        total_width = 0
-        max_height = self.config.main_font_size
-        
-        for word in words:
-            word_bbox = temp_draw.textbbox((0, 0), word.word, font=self.main_font)
-            word_width = word_bbox[2] - word_bbox[0]
-            
-            if word.furigana:
-                furigana_bbox = temp_draw.textbbox((0, 0), word.furigana, font=self.furigana_font)
-                furigana_width = furigana_bbox[2] - furigana_bbox[0]
-                word_width = max(word_width, furigana_width)
-                max_height = (self.config.main_font_size + self.config.furigana_font_size + 
-                             int(self.config.furigana_font_size * self.config.furigana_spacing_ratio))
-            
-            total_width += word_width
-        
-        return total_width, max_height
+        return int(self._measure_words(words).sum()), self._line_height(words)
     
     def _render_single_line(self, words: List[GrammaticalWord], 
-                           frame_width: int, frame_height: int) -> Image.Image:
-        total_width, total_height = self._calculate_dimensions(words)
+                           frame_width: int, frame_height: int,
+                           widths: Optional[np.ndarray] = None,
+                           total_width: Optional[int] = None, total_height: Optional[int] = None) -> Image.Image:
+        if widths is None:
+            widths = self._measure_words(words)
+        if total_width is None:
+            total_width = int(widths.sum())
+        if total_height is None:
+            total_height = self._line_height(words)
         padding = 20
         
         img = Image.new('RGBA', (total_width + 2*padding, total_height + 2*padding), (0, 0, 0, 0))
@@ -600,28 +1138,29 @@ class GrammaticalRenderer:
                          fill=(0, 0, 0, bg_alpha))
         
         current_x = padding
-        has_furigana = any(word.furigana for word in words)
+        batch = WordBatch.from_words(words, widths)
+        has_furigana = any(batch.furiganas)
         text_y = padding + (self.config.furigana_font_size + 
                            int(self.config.furigana_font_size * self.config.furigana_spacing_ratio) 
                            if has_furigana else 0)
         furigana_y = padding
         
-        for word in words:
-            word_width = self._render_word_at_position(draw, word, current_x, text_y, furigana_y, has_furigana)
-            current_x += word_width
+        for i in range(len(batch.words)):
+            current_x += self._render_word_at_position(draw, batch, i, current_x, text_y, furigana_y, has_furigana)
         
         return img
     
-    def _render_multi_line(self, words: List[GrammaticalWord], frame_width: int, frame_height: int, max_width: int) -> Image.Image:
-        lines = self._split_words_into_lines(words, max_width)
-        
-        line_height = self.config.main_font_size
-        if any(any(word.furigana for word in line) for line in lines):
-            line_height += (self.config.furigana_font_size + 
-                           int(self.config.furigana_font_size * self.config.furigana_spacing_ratio))
+    def _render_multi_line(self, words: List[GrammaticalWord], frame_width: int, frame_height: int, max_width: int,
+                           widths: Optional[np.ndarray] = None, line_height: Optional[int] = None) -> Image.Image:
+        if widths is None:
+            widths = self._measure_words(words)
+        if line_height is None:
+            line_height = self._line_height(words)
+        breaks = self._line_breaks(widths, max_width)
+        batch = WordBatch.from_words(words, widths)
         
         line_spacing = int(self.config.main_font_size * self.config.line_spacing_ratio)
-        total_height = len(lines) * line_height + (len(lines) - 1) * line_spacing
+        total_height = len(breaks) * line_height + (len(breaks) - 1) * line_spacing
         padding = 20
         
         img = Image.new('RGBA', (max_width + 2*padding, total_height + 2*padding), (0, 0, 0, 0))
@@ -634,97 +1173,98 @@ class GrammaticalRenderer:
         
         current_y = padding
         
-        for line in lines:
-            line_width, _ = self._calculate_dimensions(line)
+        for start, end in breaks:
+            line_width = sum(batch.widths[start:end])
             start_x = (max_width + 2*padding - line_width) // 2
             
-            has_furigana = any(word.furigana for word in line)
+            has_furigana = any(batch.furiganas[start:end])
             text_y = current_y + (self.config.furigana_font_size + 
                                  int(self.config.furigana_font_size * self.config.furigana_spacing_ratio) 
                                  if has_furigana else 0)
             furigana_y = current_y
             
             current_x = start_x
-            for word in line:
-                word_width = self._render_word_at_position(draw, word, current_x, text_y, furigana_y, has_furigana)
-                current_x += word_width
+            for i in range(start, end):
+                current_x += self._render_word_at_position(draw, batch, i, current_x, text_y, furigana_y, has_furigana)
             
             current_y += line_height + line_spacing
         
         return img
     
+    def _line_breaks(self, widths: np.ndarray, max_width: int) -> List[Tuple[int, int]]:
+        """Greedy line breaking as (start, end) word ranges, each line holding at least one word"""
+        cumulative = np.cumsum(widths, dtype=np.int64)
+        breaks = []
+        start = 0
+        
+        while start < len(widths):
+            line_origin = int(cumulative[start - 1]) if start else 0
+            end = int(np.searchsorted(cumulative, line_origin + max_width, side='right'))
+            end = max(end, start + 1)
+            breaks.append((start, end))
+            start = end
+        
+        return breaks
+    
     def _split_words_into_lines(self, words: List[GrammaticalWord], max_width: int) -> List[List[GrammaticalWord]]:
-        lines = []
-        current_line = []
-        current_width = 0
-        
-        for word in words:
-            word_width = self._get_word_width(word)
-            
-            if current_width + word_width > max_width and current_line:
-                lines.append(current_line)
-                current_line = []
-                current_width = 0
-            
-            current_line.append(word)
-            current_width += word_width
-        
-        if current_line:
-            lines.append(current_line)
-        
-        return lines
+        return [words[start:end] for start, end in self._line_breaks(self._measure_words(words), max_width)]
     
     def _get_word_width(self, word: GrammaticalWord) -> int:
-        temp_img = Image.new('RGB', (1, 1))
-        temp_draw = ImageDraw.Draw(temp_img)
-        
-        word_bbox = temp_draw.textbbox((0, 0), word.word, font=self.main_font)
-        word_width = word_bbox[2] - word_bbox[0]
+        word_width = self._measure(word.word, self.main_font)
         
         if word.furigana:
-            furigana_bbox = temp_draw.textbbox((0, 0), word.furigana, font=self.furigana_font)
-            furigana_width = furigana_bbox[2] - furigana_bbox[0]
-            word_width = max(word_width, furigana_width)
+            word_width = max(word_width, self._measure(word.furigana, self.furigana_font))
         
         return word_width
     
-    def _render_word_at_position(self, draw: ImageDraw.Draw, word: GrammaticalWord, 
+    def _render_word_at_position(self, draw: ImageDraw.Draw, batch: WordBatch, i: int,
                                x: int, text_y: int, furigana_y: int, line_has_furigana: bool) -> int:
-        word_width = self._get_word_width(word)
+        word_width = batch.widths[i]
+        text = batch.words[i]
         
         # Center text within word width
-        word_bbox = draw.textbbox((0, 0), word.word, font=self.main_font)
-        text_width = word_bbox[2] - word_bbox[0]
+        text_width = self._measure(text, self.main_font)
         text_x = x + (word_width - text_width) // 2
         
         # Draw word with color
-        self._draw_text_with_stroke(draw, text_x, text_y, word.word, self.main_font, word.color)
+        self._draw_text_with_stroke(draw, text_x, text_y, text, self.main_font,
+                                    batch.colors[i], batch.stroke_colors[i])
         
         # Draw furigana
-        if word.furigana and line_has_furigana:
-            furigana_bbox = draw.textbbox((0, 0), word.furigana, font=self.furigana_font)
-            furigana_width = furigana_bbox[2] - furigana_bbox[0]
+        furigana = batch.furiganas[i]
+        if furigana and line_has_furigana:
+            furigana_width = self._measure(furigana, self.furigana_font)
             furigana_x = x + (word_width - furigana_width) // 2
             
-            furigana_color = self._lighten_color(word.color)
-            self._draw_text_with_stroke(draw, furigana_x, furigana_y, word.furigana, self.furigana_font, furigana_color)
+            self._draw_text_with_stroke(draw, furigana_x, furigana_y, furigana, self.furigana_font,
+                                        batch.furigana_colors[i], batch.furigana_stroke_colors[i])
         
         return word_width
     
     def _draw_text_with_stroke(self, draw: ImageDraw.Draw, x: int, y: int, 
-                              text: str, font: ImageFont.FreeTypeFont, color: Tuple[int, int, int]):
-        stroke_color = tuple(max(0, c // 3) for c in color)
-        stroke_width = self.config.stroke_width
-        
-        for dx in range(-stroke_width, stroke_width + 1):
-            for dy in range(-stroke_width, stroke_width + 1):
-                if dx*dx + dy*dy <= stroke_width*stroke_width:
-                    draw.text((x + dx, y + dy), text, font=font, fill=stroke_color)
-        
-        draw.text((x, y), text, font=font, fill=color)
+                              text: str, font: ImageFont.FreeTypeFont, color: Tuple[int, int, int],
+                              stroke_color: Optional[Tuple[int, int, int]] = None):
+        if stroke_color is None:
+            stroke_color = GrammaticalColorScheme.STROKE_MAP.get(color) or GrammaticalColorScheme.stroke(color)
+        
+        # FreeType strokes the outline in one pass instead of stamping offset copies
+        draw.text((x, y), text, font=font, fill=color,
+                  stroke_width=self.config.stroke_width, stroke_fill=stroke_color)
     
     def _lighten_color(self, color: Tuple[int, int, int], factor: float = 0.7) -> Tuple[int, int, int]:
-        return tuple(min(255, int(c + (255 - c) * factor)) for c in color)
+        return GrammaticalColorScheme.lighten(color, factor)
+
+
+_worker_renderer: Optional[GrammaticalRenderer] = None
+
+
+def _init_render_worker(config: BurnerConfig):
+    global _worker_renderer
+    _worker_renderer = GrammaticalRenderer(config)
+
+
+def _render_in_worker(words: List[GrammaticalWord], frame_width: int, frame_height: int) -> Image.Image:
+    return _worker_renderer._render_uncached(words, frame_width, frame_height)
 
 
 class SubtitleWriter:
@@ -745,28 +1285,26 @@ class SubtitleWriter:
                 if segment.lang:
                     item["lang"] = segment.lang
                 
-                if segment.grammatical_words:
-                    item["grammatical_analysis"] = []
-                    furigana_parts = []
-                    
-                    for word in segment.grammatical_words:
-                        item["grammatical_analysis"].append({
-                            "word": word.word,
-                            "furigana": word.furigana or "",
-                            "type": word.grammatical_type.value
-                        })
-                        
-                        if word.furigana:
-                            furigana_parts.append(f"{word.word}({word.furigana})")
-                        else:
-                            furigana_parts.append(word.word)
+                words = segment.grammatical_words
+                if words:
+                    item["grammatical_analysis"] = [{
+                        "word": word.word,
+                        "furigana": word.furigana or "",
+                        "type": word.grammatical_type.value
+                    } for word in words]
                     
-                    item["furigana_text"] = "".join(furigana_parts)
+                    item["furigana_text"] = "".join(
+                        f"{word.word}({word.furigana})" if word.furigana else word.word
+                        for word in words)
                 
                 json_data.append(item)
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, ensure_ascii=False, indent=2)
+            if ORJSON_AVAILABLE:
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(json_data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    json.dump(json_data, f, ensure_ascii=False, indent=2)
             
             print(f"💾 Saved JSON: {output_path}")
             return True
@@ -775,6 +1313,48 @@ class SubtitleWriter:
             print(f"❌ Error saving JSON: {e}")
             return False
     
+    @staticmethod
+    def load_json_with_grammar(segments: List[SubtitleSegment], json_path: str) -> bool:
+        """Attach the analysis saved in json_path if it was written for exactly these segments"""
+        if not os.path.exists(json_path):
+            return False
+        try:
+            with open(json_path, 'rb') as f:
+                raw = f.read()
+            data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw.decode('utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read {json_path}: {e}")
+            return False
+        
+        if not isinstance(data, list) or len(data) != len(segments):
+            return False
+        
+        # Compare what save_json_with_grammar would write, so any edit to the
+        # subtitle file (text, timing, language) invalidates the checkpoint
+        words_per_segment = []
+        for segment, item in zip(segments, data):
+            if (not isinstance(item, dict)
+                    or item.get("text") != segment.text
+                    or (item.get("lang") or None) != (segment.lang or None)
+                    or item.get("start") != SubtitleWriter._format_timestamp(segment.start_time)
+                    or item.get("end") != SubtitleWriter._format_timestamp(segment.end_time)):
+                return False
+            
+            words = []
+            for word_data in item.get("grammatical_analysis", []):
+                grammatical_type = GRAMMATICAL_TYPE_MAP.get(word_data.get("type"), GrammaticalType.OTHER)
+                words.append(GrammaticalWord(
+                    word=word_data.get("word", ""),
+                    furigana=word_data.get("furigana") or None,
+                    grammatical_type=grammatical_type,
+                    color=GrammaticalColorScheme.COLOR_MAP[grammatical_type]
+                ))
+            words_per_segment.append(words)
+        
+        for segment, words in zip(segments, words_per_segment):
+            segment.grammatical_words = words
+        return True
+    
     @staticmethod
     def _format_timestamp(seconds: float) -> str:
         hours = int(seconds // 3600)
@@ -784,6 +1364,276 @@ class SubtitleWriter:
         return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
 
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_has_encoder(name: str) -> bool:
+    """Check whether the installed ffmpeg was built with the given encoder"""
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], 
+                                capture_output=True, text=True)
+    except OSError:
+        return False
+    return any(line.split()[1:2] == [name] for line in result.stdout.splitlines())
+
+
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_encoder_works(name: str) -> bool:
+    """Encode one test frame: distro and static ffmpeg builds list NVENC even without an NVIDIA GPU"""
+    if not _ffmpeg_has_encoder(name):
+        return False
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+           '-f', 'lavfi', '-i', 'nullsrc=s=256x256', '-frames:v', '1',
+           '-c:v', name, '-f', 'null', '-']
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+def _resolve_ffmpeg_encoder(encoder: str) -> str:
+    """Map 'auto' to NVENC when it can actually encode here, otherwise libx264"""
+    if encoder == 'auto':
+        return 'h264_nvenc' if _ffmpeg_encoder_works('h264_nvenc') else 'libx264'
+    return encoder
+
+
+def _ffmpeg_encoder_args(encoder: str, crf: int, preset: str = 'veryfast') -> List[str]:
+    """Video codec arguments at a comparable quality level for each encoder"""
+    if encoder == 'h264_nvenc':
+        return ['-c:v', 'h264_nvenc', '-preset', 'p4', '-cq', str(crf + 1)]
+    return ['-c:v', 'libx264', '-preset', preset, '-crf', str(crf)]
+
+
+# Fallback (video encoder, audio codec) pairs after the configured encoder with copied audio:
+# copying fails at mux time for audio MP4 cannot hold (PCM, Vorbis), so it is re-encoded, then dropped
+FFMPEG_FALLBACK_ENCODINGS = [('libx264', 'aac'), ('libx264', None)]
+
+
+def _ffmpeg_encodings(encoder: str) -> List[Tuple[str, Optional[str]]]:
+    """(video encoder, audio codec or None for no audio) pairs to try in order"""
+    return list(dict.fromkeys([(encoder, 'copy')] + FFMPEG_FALLBACK_ENCODINGS))
+
+
+# Requested capacity of the frame pipe to ffmpeg; 1 MiB is Linux's unprivileged maximum
+FFMPEG_PIPE_SIZE = 1 << 20
+
+
+def _grow_pipe(fd: int, size: int):
+    """Best effort: enlarge a Linux pipe so each frame crosses in fewer, larger writes"""
+    try:
+        import fcntl
+        fcntl.fcntl(fd, getattr(fcntl, 'F_SETPIPE_SZ', 1031), size)
+    except (ImportError, OSError):
+        pass  # Not Linux, or above /proc/sys/fs/pipe-max-size: keep the default 64 KiB
+
+
+class FFmpegVideoWriter:
+    """cv2.VideoWriter-compatible writer that pipes raw frames (BGR by default) to ffmpeg"""
+    
+    def __init__(self, output_path: str, fps: float, frame_size: Tuple[int, int],
+                 crf: int = 20, preset: str = 'veryfast', encoder: str = 'libx264',
+                 audio_source: Optional[str] = None, input_pix_fmt: str = 'bgr24',
+                 audio_codec: str = 'copy'):
+        width, height = frame_size
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-vcodec', 'rawvideo',
+            '-s', f"{width}x{height}", '-pix_fmt', input_pix_fmt, '-r', f"{fps}",
+            '-i', '-',
+        ]
+        if audio_source:
+            # The source's audio (if any) alongside the burned video, copied by default
+            cmd += ['-i', audio_source, '-map', '0:v:0', '-map', '1:a?', '-c:a', audio_codec]
+        cmd += _ffmpeg_encoder_args(encoder, crf, preset) + ['-pix_fmt', 'yuv420p', output_path]
+        self.encoder = encoder
+        self.returncode = None
+        # ffmpeg reads raw bytes, so a frame of the wrong shape would scramble the video
+        self._frame_shape = {'bgr24': (height, width, 3),
+                             'yuv420p': (height * 3 // 2, width)}.get(input_pix_fmt)
+        try:
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        except OSError as e:
+            print(f"⚠️ Could not start ffmpeg: {e}")
+            self._proc = None
+        else:
+            _grow_pipe(self._proc.stdin.fileno(), FFMPEG_PIPE_SIZE)
+    
+    def isOpened(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+    
+    def write(self, frame: np.ndarray):
+        if self._frame_shape is not None and frame.shape != self._frame_shape:
+            raise ValueError(f"frame shape {frame.shape} does not match the output {self._frame_shape}")
+        self._proc.stdin.write(np.ascontiguousarray(frame).data)
+    
+    def release(self) -> bool:
+        """Close the pipe and wait for ffmpeg; False unless it exited cleanly"""
+        if self._proc is not None:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass  # ffmpeg already exited; its exit code says why
+            self.returncode = self._proc.wait()
+            self._proc = None
+        return self.returncode == 0
+
+
+def _release_writer(out) -> bool:
+    """Release either writer type; cv2.VideoWriter reports no encode status"""
+    if isinstance(out, FFmpegVideoWriter):
+        return out.release()
+    out.release()
+    return True
+
+
+def _blend_plane_kernel(region, premultiplied, inv_alpha):
+    """region = (t + (t >> 8)) >> 8 with t = region * (255 - a) + premultiplied, in one fused pass"""
+    height, width, channels = premultiplied.shape
+    for i in prange(height):
+        for j in range(width):
+            inv = inv_alpha[i, j, 0]
+            for c in range(channels):
+                t = region[i, j, c] * inv + premultiplied[i, j, c]
+                region[i, j, c] = (t + (t >> 8)) >> 8
+
+
+if NUMBA_AVAILABLE:
+    # Explicit signature compiles (or loads from cache) at import, so the first
+    # frame does not pay for JIT warm-up. Overlay planes are C-contiguous; the
+    # frame region may be any view.
+    _blend_plane_kernel = njit(
+        'void(uint8[:, :, :], uint16[:, :, ::1], uint16[:, :, ::1])',
+        parallel=True, fastmath=True, cache=True, boundscheck=False
+    )(_blend_plane_kernel)
+
+
+# Frames buffered between the decode, blend and encode threads
+PIPELINE_DEPTH = 8
+
+
+def _put_unless_stopped(frames: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the consumer has signalled stop"""
+    while not stop.is_set():
+        try:
+            frames.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _decode_frames(cap: cv2.VideoCapture, frames: queue.Queue, stop: threading.Event):
+    """Reader thread: queue decoded frames, then None at end of stream"""
+    while not stop.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if not _put_unless_stopped(frames, frame, stop):
+            return
+    _put_unless_stopped(frames, None, stop)
+
+
+def _pyav_rotation(stream, av_frame) -> int:
+    """Display rotation in degrees from the frame's display matrix or the older 'rotate' tag"""
+    try:
+        rotation = int(getattr(av_frame, 'rotation', 0) or 0)
+        return rotation or int(float(stream.metadata.get('rotate', 0)))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _decode_frames_pyav(video_path: str, frames: queue.Queue, stop: threading.Event,
+                        failed: threading.Event, frame_size: Tuple[int, int], pix_fmt: str = 'bgr24'):
+    """Reader thread: multithreaded libavcodec decode through PyAV, then None at end of stream
+    
+    A decode error sets failed before the None, so the caller can tell it from a clean end.
+    frame_size is the (width, height) OpenCV reported; OpenCV applies rotation metadata
+    and PyAV does not, so a rotated stream fails here instead of being encoded sideways.
+    """
+    try:
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            stream.thread_type = 'AUTO'  # Frame + slice threading inside libavcodec
+            for index, av_frame in enumerate(container.decode(stream)):
+                if index == 0:
+                    rotation = _pyav_rotation(stream, av_frame)
+                    if rotation % 360 or (av_frame.width, av_frame.height) != frame_size:
+                        raise ValueError(f"stored frames are {av_frame.width}x{av_frame.height} "
+                                         f"rotated {rotation}°, displayed {frame_size[0]}x{frame_size[1]}")
+                if not _put_unless_stopped(frames, av_frame.to_ndarray(format=pix_fmt), stop):
+                    return
+    except Exception as e:
+        print(f"❌ PyAV decoding failed: {e}")
+        failed.set()
+    _put_unless_stopped(frames, None, stop)
+
+
+# Luma weights (Kr, Kb) of the YCbCr matrices an H.264/HEVC stream may signal
+YUV_MATRIX_BT601 = (0.299, 0.114)
+YUV_MATRIX_BT709 = (0.2126, 0.0722)
+
+
+def _video_yuv_matrix(video_path: str, height: int) -> Tuple[float, float]:
+    """The stream's signalled YCbCr matrix; untagged video follows the HD (>= 720 lines) convention"""
+    try:
+        with av.open(video_path) as container:
+            colorspace = int(container.streams.video[0].codec_context.colorspace)
+    except Exception:
+        colorspace = 2  # Unspecified
+    if colorspace == 1:  # AVCOL_SPC_BT709
+        return YUV_MATRIX_BT709
+    if colorspace in (5, 6):  # AVCOL_SPC_BT470BG, AVCOL_SPC_SMPTE170M
+        return YUV_MATRIX_BT601
+    return YUV_MATRIX_BT709 if height >= 720 else YUV_MATRIX_BT601
+
+
+def _rgb_to_yuv_limited(rgb: np.ndarray, matrix: Tuple[float, float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Full-resolution limited-range Y, U, V planes of an RGB image under the given matrix"""
+    kr, kb = matrix
+    r, g, b = (rgb[:, :, c].astype(np.float32) for c in range(3))
+    luma = kr * r + (1 - kr - kb) * g + kb * b
+    y = 16 + luma * (219 / 255)
+    u = 128 + (b - luma) * (224 / 255 / (2 * (1 - kb)))
+    v = 128 + (r - luma) * (224 / 255 / (2 * (1 - kr)))
+    return tuple(np.clip(np.rint(plane), 0, 255).astype(np.uint8) for plane in (y, u, v))
+
+
+def _crop_to_alpha(rgba: np.ndarray, even: bool = False) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """Trim fully transparent borders; returns the crop and its (x, y) offset in the image"""
+    x, y, width, height = cv2.boundingRect(rgba[:, :, 3])
+    if even:
+        # Keep the crop on the 2x2 chroma grid (the image itself has even dimensions)
+        x1, y1 = (x + width + 1) & ~1, (y + height + 1) & ~1
+        x, y = x & ~1, y & ~1
+        width, height = x1 - x, y1 - y
+    return rgba[y:y + height, x:x + width], (x, y)
+
+
+def _i420_planes(buffer: np.ndarray, height: int, width: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Y, U and V views into a contiguous yuv420p (I420) buffer"""
+    flat = buffer.reshape(-1)
+    luma = height * width
+    chroma = (height // 2) * (width // 2)
+    return (flat[:luma].reshape(height, width),
+            flat[luma:luma + chroma].reshape(height // 2, width // 2),
+            flat[luma + chroma:luma + 2 * chroma].reshape(height // 2, width // 2))
+
+
+def _write_frames(out: cv2.VideoWriter, frames: queue.Queue, failed: threading.Event):
+    """Writer thread: encode queued frames in order until None arrives; errors set failed"""
+    while True:
+        frame = frames.get()
+        if frame is None:
+            break
+        if failed.is_set():
+            continue  # Keep draining so the producer never blocks
+        try:
+            out.write(frame)
+        except Exception as e:
+            print(f"❌ Writing frame failed: {e}")
+            failed.set()
+
+
 class SimpleFuriganaBurnerApp:
     """Simplified furigana burner with working post-processing"""
     
@@ -791,6 +1641,14 @@ class SimpleFuriganaBurnerApp:
         self.config = config or BurnerConfig()
         self.analyzer = SimpleGrammaticalAnalyzer(self.config)
         self.renderer = GrammaticalRenderer(self.config)
+        # Premultiplied + inverse-alpha planes per rendered subtitle image, converted once
+        self._overlay_cache: Dict[int, Tuple[Image.Image, np.ndarray, np.ndarray, Tuple[int, int]]] = {}
+        self._yuv_overlay_cache: Dict[Tuple[int, Tuple[float, float]],
+                                      Tuple[Image.Image, List[Tuple[np.ndarray, np.ndarray]], Tuple[int, int]]] = {}
+        # Flat blend scratch (uint16 accumulator, uint8 result), sized to the
+        # largest overlay plane before the frame loop starts
+        self._blend_scratch = np.empty(0, dtype=np.uint16)
+        self._blend_out = np.empty(0, dtype=np.uint8)
         
         cache_status = "FORCE REFRESH" if self.config.force_refresh else "USE CACHE"
         print(f"🚀 Simple Furigana Burner initialized ({cache_status})")
@@ -808,28 +1666,38 @@ class SimpleFuriganaBurnerApp:
             if not segments:
                 return False
             
-            print(f"\n🔍 Analyzing {len(segments)} segments...")
-            
-            for i, segment in enumerate(segments):
-                words = self.analyzer.analyze_sentence(segment.text, segment.lang)
-                segment.grammatical_words = words
-                
-                if i < 3:  # Preview first 3
-                    preview = " ".join([
-                        f"{word.word}({word.furigana})" if word.furigana else word.word
-                        for word in words
-                    ])
-                    print(f"   {i+1}: {segment.text}")
-                    print(f"      → {preview}")
-            
-            # Save files
             base_name = os.path.splitext(os.path.basename(subtitle_path))[0]
             output_dir = os.path.dirname(output_path) or '.'
             json_output = os.path.join(output_dir, f"{base_name}_simple.json")
             
-            SubtitleWriter.save_json_with_grammar(segments, json_output)
+            # A previous run's JSON is the checkpoint: reuse it while it still matches the subtitles
+            if not self.config.force_refresh and SubtitleWriter.load_json_with_grammar(segments, json_output):
+                print(f"♻️ Reusing analysis from {os.path.basename(json_output)}")
+            else:
+                print(f"\n🔍 Analyzing {len(segments)} segments...")
+                
+                analyzed = self.analyzer.analyze_batch([segment.text for segment in segments],
+                                                       [segment.lang for segment in segments])
+                
+                for i, (segment, words) in enumerate(zip(segments, analyzed)):
+                    segment.grammatical_words = words
+                    
+                    if i < 3:  # Preview first 3
+                        preview = " ".join([
+                            f"{word.word}({word.furigana})" if word.furigana else word.word
+                            for word in words
+                        ])
+                        print(f"   {i+1}: {segment.text}")
+                        print(f"      → {preview}")
+                
+                # Saved before encoding, so a failed burn keeps the analysis
+                SubtitleWriter.save_json_with_grammar(segments, json_output)
             
             # Process video
+            if self.config.burn_backend == 'ffmpeg':
+                if shutil.which('ffmpeg'):
+                    return self._burn_with_ffmpeg_overlay(video_path, segments, output_path)
+                print("⚠️ ffmpeg not found, blending in Python")
             return self._burn_to_video(video_path, segments, output_path)
             
         except Exception as e:
@@ -837,9 +1705,40 @@ class SimpleFuriganaBurnerApp:
             return False
     
     def _burn_to_video(self, video_path: str, segments: List[SubtitleSegment], output_path: str) -> bool:
+        use_pyav = self._use_pyav()
+        encodings = _ffmpeg_encodings(_resolve_ffmpeg_encoder(self.config.ffmpeg_encoder))
+        attempt = 0
+        while True:
+            encoder, audio_codec = encodings[attempt]
+            status = self._burn_pass(video_path, segments, output_path, use_pyav, encoder, audio_codec)
+            if status == 'decode' and use_pyav:
+                # The output so far is truncated; redo it once with OpenCV's demuxer and decoder
+                print("⚠️ Retrying with the OpenCV decoder")
+                use_pyav = False
+            elif status == 'encode' and attempt + 1 < len(encodings):
+                attempt += 1
+                encoder, audio_codec = encodings[attempt]
+                print(f"⚠️ Encoding failed, retrying with {encoder} and "
+                      f"{'audio ' + audio_codec if audio_codec else 'no audio'}")
+            else:
+                break
+        
+        if status != 'ok':
+            print(f"❌ Burning failed: {output_path}")
+            return False
+        
+        print(f"✅ Completed: {output_path}")
+        return True
+    
+    def _burn_pass(self, video_path: str, segments: List[SubtitleSegment], output_path: str,
+                   use_pyav: bool, encoder: str, audio_codec: Optional[str]) -> str:
+        """Decode, blend and encode once: 'ok', or which stage failed ('decode', 'encode', 'open', 'failed')"""
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
-            return False
+            return 'open'
+        out = None
+        decode_failed = threading.Event()
+        write_failed = threading.Event()
         
         try:
             fps = cap.get(cv2.CAP_PROP_FPS)
@@ -847,85 +1746,382 @@ class SimpleFuriganaBurnerApp:
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
             
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+            # PyAV -> ffmpeg can stay in yuv420p end to end: half the bytes of BGR24 per frame
+            yuv = self.config.blend_in_yuv and use_pyav and width % 2 == 0 and height % 2 == 0
             
-            frame_count = 0
-            last_progress = -1
+            out = self._create_video_writer(output_path, fps, width, height, encoder,
+                                            audio_source=video_path if audio_codec else None,
+                                            input_pix_fmt='yuv420p' if yuv else 'bgr24',
+                                            audio_codec=audio_codec or 'copy')
+            if not out.isOpened():
+                print(f"❌ Could not create output video: {output_path}")
+                return 'open'
+            yuv = yuv and isinstance(out, FFmpegVideoWriter)
+            # Overlays must be converted with the matrix the source frames were encoded with
+            yuv_matrix = _video_yuv_matrix(video_path, height) if yuv else None
             
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                current_time = frame_count / fps
-                
-                # Find active subtitle
-                active_segment = None
-                for segment in segments:
-                    if segment.start_time <= current_time <= segment.end_time:
-                        active_segment = segment
-                        break
-                
-                # Add subtitle
-                if active_segment and active_segment.grammatical_words:
-                    try:
-                        frame = self._add_subtitle_to_frame(frame, active_segment.grammatical_words, width, height)
-                    except Exception as e:
-                        print(f"⚠️ Subtitle error: {e}")
-                
-                out.write(frame)
-                frame_count += 1
-                
-                progress = int((frame_count / total_frames) * 100)
-                if progress != last_progress and progress % 10 == 0:
-                    print(f"⏳ Progress: {progress}%")
-                    last_progress = progress
+            # Rasterize every subtitle up front; the frame loop then only blends
+            self._prepare_overlays(segments, width, height, yuv_matrix)
             
-            print(f"✅ Completed: {output_path}")
-            return True
+            # cap is only touched by the reader thread and out by the writer thread
+            decoded = queue.Queue(maxsize=PIPELINE_DEPTH)
+            blended = queue.Queue(maxsize=PIPELINE_DEPTH)
+            stop = threading.Event()
+            if use_pyav:
+                reader = threading.Thread(target=_decode_frames_pyav, daemon=True,
+                                          args=(video_path, decoded, stop, decode_failed, (width, height),
+                                                'yuv420p' if yuv else 'bgr24'))
+            else:
+                reader = threading.Thread(target=_decode_frames, args=(cap, decoded, stop), daemon=True)
+            writer = threading.Thread(target=_write_frames, args=(out, blended, write_failed), daemon=True)
+            reader.start()
+            writer.start()
+            
+            try:
+                self._blend_frames(decoded, blended, segments, fps, width, height, total_frames, yuv)
+            finally:
+                stop.set()
+                blended.put(None)
+                reader.join()
+                writer.join()
             
         finally:
             cap.release()
-            out.release()
+            # out is None when setup raised; that exception propagates from here
+            encoded = out is not None and _release_writer(out) and not write_failed.is_set()
+        
+        if decode_failed.is_set():
+            return 'decode'
+        if not encoded:
+            # Only ffmpeg has fallbacks to try; OpenCV's writer failing is final
+            return 'encode' if isinstance(out, FFmpegVideoWriter) else 'failed'
+        return 'ok'
     
-    def _add_subtitle_to_frame(self, frame: np.ndarray, words: List[GrammaticalWord], 
-                              frame_width: int, frame_height: int) -> np.ndarray:
-        try:
-            subtitle_img = self.renderer.render_grammatical_subtitle(words, frame_width, frame_height)
-            subtitle_cv = cv2.cvtColor(np.array(subtitle_img), cv2.COLOR_RGBA2BGRA)
-            subtitle_height, subtitle_width = subtitle_cv.shape[:2]
+    def _burn_with_ffmpeg_overlay(self, video_path: str, segments: List[SubtitleSegment], output_path: str) -> bool:
+        """Composite in ffmpeg: each subtitle becomes one full-frame PNG shown for its cue, so no frame passes through Python"""
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            return False
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+        
+        self.renderer.prerender([segment.grammatical_words for segment in segments], width, height)
+        
+        with tempfile.TemporaryDirectory(prefix='furigana_') as temp_dir:
+            Image.new('RGBA', (width, height), (0, 0, 0, 0)).save(os.path.join(temp_dir, 'blank.png'))
+            
+            # ffconcat timeline: subtitle images for cues, the blank image for gaps.
+            # Overlapping cues are clipped so the earlier one keeps the screen.
+            lines = ['ffconcat version 1.0']
+            current_time = 0.0
+            image_count = 0
+            order = sorted(range(len(segments)), key=lambda i: (segments[i].start_time, i))
+            for index in order:
+                segment = segments[index]
+                start = max(segment.start_time, current_time)
+                if segment.end_time <= start or not segment.grammatical_words:
+                    continue
+                try:
+                    subtitle_img = self.renderer.render_grammatical_subtitle(
+                        segment.grammatical_words, width, height)
+                except Exception as e:
+                    print(f"⚠️ Rendering error: {e}")
+                    continue
+                
+                canvas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+                canvas.paste(subtitle_img, self._overlay_position(
+                    (subtitle_img.height, subtitle_img.width), width, height))
+                name = f"segment_{index:05d}.png"
+                canvas.save(os.path.join(temp_dir, name), compress_level=1)
+                
+                if start > current_time:
+                    lines += ["file 'blank.png'", f"duration {start - current_time:.3f}"]
+                lines += [f"file '{name}'", f"duration {segment.end_time - start:.3f}"]
+                current_time = segment.end_time
+                image_count += 1
+            # The concat demuxer ignores the last entry's duration; end on a blank frame
+            lines += ["file 'blank.png'", "duration 1", "file 'blank.png'"]
             
-            # Position subtitle
-            x = (frame_width - subtitle_width) // 2
-            margin = self.config.margin
+            list_path = os.path.join(temp_dir, 'subtitles.ffconcat')
+            with open(list_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            
+            encoder = _resolve_ffmpeg_encoder(self.config.ffmpeg_encoder)
+            # A hardware encoder can still fail mid-run (sessions, VRAM), and copied audio at mux time
+            for encoder, audio_codec in _ffmpeg_encodings(encoder):
+                audio_args = ['-map', '0:a?', '-c:a', audio_codec] if audio_codec else []
+                cmd = [
+                    'ffmpeg', '-y', '-loglevel', 'error',
+                    '-i', video_path,
+                    '-f', 'concat', '-safe', '0', '-i', list_path,
+                    '-filter_complex', '[0:v][1:v]overlay=eof_action=pass,format=yuv420p[v]',
+                    '-map', '[v]',
+                ] + audio_args + _ffmpeg_encoder_args(encoder, 20) + [output_path]
+                
+                print(f"🎞️ Compositing {image_count} subtitle images with ffmpeg ({encoder}, audio {audio_codec or 'none'})")
+                result = subprocess.run(cmd)
+                if result.returncode == 0:
+                    break
+                print(f"⚠️ ffmpeg ({encoder}, audio {audio_codec or 'none'}) exited with code {result.returncode}")
+        
+        if result.returncode != 0:
+            print(f"❌ ffmpeg overlay failed (exit code {result.returncode})")
+            return False
+        print(f"✅ Completed: {output_path}")
+        return True
+    
+    def _use_pyav(self) -> bool:
+        if self.config.video_decoder == 'opencv':
+            return False
+        if not PYAV_AVAILABLE:
+            if self.config.video_decoder == 'pyav':
+                print("⚠️ PyAV not installed, decoding with OpenCV")
+            return False
+        return True
+    
+    def _create_video_writer(self, output_path: str, fps: float, width: int, height: int, encoder: str,
+                             audio_source: Optional[str] = None, input_pix_fmt: str = 'bgr24',
+                             audio_codec: str = 'copy'):
+        """Encode with the given ffmpeg encoder (keeping audio) when available, else OpenCV's mp4v"""
+        if shutil.which('ffmpeg'):
+            out = FFmpegVideoWriter(output_path, fps, (width, height), encoder=encoder,
+                                    audio_source=audio_source, input_pix_fmt=input_pix_fmt,
+                                    audio_codec=audio_codec)
+            if out.isOpened():
+                print(f"🎞️ Encoding with ffmpeg ({encoder})")
+                return out
+            out.release()
+        
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        return cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    
+    def _blend_frames(self, decoded: queue.Queue, blended: queue.Queue, segments: List[SubtitleSegment],
+                      fps: float, width: int, height: int, total_frames: int, yuv: bool = False):
+        """Blend stage of the pipeline: subtitle each decoded frame and pass it on"""
+        frame_count = 0
+        # Progress is printed every 10%; the next threshold frame is precomputed
+        # so the loop only compares two ints
+        next_percent = 10
+        next_report = -(-total_frames * next_percent // 100) if total_frames > 0 else -1
+        # The active segment is an O(1) table lookup per frame
+        frame_segments = self._build_frame_segment_table(segments, fps, total_frames)
+        
+        while True:
+            frame = decoded.get()
+            if frame is None:
+                break
             
-            if self.config.position == 'top':
-                y = margin
-            elif self.config.position == 'center':
-                y = (frame_height - subtitle_height) // 2
+            # Find active subtitle
+            if frame_count < total_frames:
+                segment_index = frame_segments[frame_count]
             else:
-                y = frame_height - subtitle_height - margin
+                # Reported frame count can be an estimate; scan past its end
+                segment_index = self._find_segment_index(segments, frame_count / fps)
+            active_segment = segments[segment_index] if segment_index >= 0 else None
+            
+            # Add subtitle
+            if yuv:
+                if active_segment and active_segment.overlay_yuv is not None:
+                    try:
+                        frame = self._blend_overlay_yuv(frame, active_segment.overlay_yuv,
+                                                        *active_segment.overlay_xy)
+                    except Exception as e:
+                        print(f"⚠️ Subtitle error: {e}")
+            elif active_segment and active_segment.overlay_premultiplied is not None:
+                try:
+                    frame = self._blend_overlay(frame, active_segment.overlay_premultiplied,
+                                                active_segment.overlay_inv_alpha, *active_segment.overlay_xy)
+                except Exception as e:
+                    print(f"⚠️ Subtitle error: {e}")
             
-            x = max(0, min(x, frame_width - subtitle_width))
-            y = max(0, min(y, frame_height - subtitle_height))
+            blended.put(frame)
+            frame_count += 1
             
-            # Blend
-            if (x + subtitle_width <= frame_width and y + subtitle_height <= frame_height):
-                alpha = subtitle_cv[:, :, 3] / 255.0
-                alpha = np.stack([alpha] * 3, axis=2)
-                
-                overlay_region = frame[y:y+subtitle_height, x:x+subtitle_width]
-                subtitle_rgb = subtitle_cv[:, :, :3]
-                
-                if overlay_region.shape == subtitle_rgb.shape == alpha.shape:
-                    blended = overlay_region * (1 - alpha) + subtitle_rgb * alpha
-                    frame[y:y+subtitle_height, x:x+subtitle_width] = blended.astype(np.uint8)
+            if 0 < next_report <= frame_count:
+                # Short videos can cross several thresholds in one frame; report the last
+                while 0 < next_report <= frame_count:
+                    reached = next_percent
+                    next_percent += 10
+                    next_report = -(-total_frames * next_percent // 100) if next_percent <= 100 else -1
+                print(f"⏳ Progress: {reached}%")
+    
+    def _build_frame_segment_table(self, segments: List[SubtitleSegment], 
+                                   fps: float, total_frames: int) -> np.ndarray:
+        """Map each frame index to its active segment index, or -1"""
+        frame_segments = np.full(max(0, total_frames), -1, dtype=np.int32)
+        
+        # Fill in reverse so the first listed segment wins where cues overlap
+        for index in range(len(segments) - 1, -1, -1):
+            segment = segments[index]
+            first = max(0, math.ceil(segment.start_time * fps))
+            last = min(total_frames, math.floor(segment.end_time * fps) + 1)
+            if first < last:
+                frame_segments[first:last] = index
+        
+        return frame_segments
+    
+    def _find_segment_index(self, segments: List[SubtitleSegment], current_time: float) -> int:
+        """Index of the first segment active at current_time, or -1"""
+        for index, segment in enumerate(segments):
+            if segment.start_time <= current_time <= segment.end_time:
+                return index
+        return -1
+    
+    def _prepare_overlays(self, segments: List[SubtitleSegment], frame_width: int, frame_height: int,
+                          yuv_matrix: Optional[Tuple[float, float]] = None):
+        """Render (in parallel), convert and place every segment's subtitle once
         
-        except Exception as e:
-            print(f"⚠️ Rendering error: {e}")
+        A yuv_matrix prepares yuv420p planes under that matrix instead of BGR.
+        """
+        self.renderer.prerender([segment.grammatical_words for segment in segments], frame_width, frame_height)
+        
+        for segment in segments:
+            if not segment.grammatical_words:
+                continue
+            try:
+                subtitle_img = self.renderer.render_grammatical_subtitle(
+                    segment.grammatical_words, frame_width, frame_height)
+                x, y = self._overlay_position((subtitle_img.height, subtitle_img.width), frame_width, frame_height)
+                if yuv_matrix:
+                    segment.overlay_yuv, (dx, dy) = self._overlay_planes_yuv(subtitle_img, yuv_matrix)
+                    # Even offsets keep the overlay aligned with the 2x2 chroma grid
+                    segment.overlay_xy = ((x & ~1) + dx, (y & ~1) + dy)
+                    continue
+                premultiplied, inv_alpha, (dx, dy) = self._overlay_arrays(subtitle_img)
+                segment.overlay_premultiplied = premultiplied
+                segment.overlay_inv_alpha = inv_alpha
+                segment.overlay_xy = (x + dx, y + dy)
+            except Exception as e:
+                print(f"⚠️ Rendering error: {e}")
+        
+        # Allocate the blend scratch once for the largest overlay plane
+        sizes = [segment.overlay_premultiplied.size for segment in segments
+                 if segment.overlay_premultiplied is not None]
+        sizes += [plane.size for segment in segments if segment.overlay_yuv
+                  for plane, _ in segment.overlay_yuv]
+        if sizes:
+            self._reserve_blend_scratch(max(sizes))
+    
+    def _overlay_position(self, subtitle_shape: Tuple[int, ...], frame_width: int, frame_height: int) -> Tuple[int, int]:
+        subtitle_height, subtitle_width = subtitle_shape[:2]
+        
+        # Position subtitle
+        x = (frame_width - subtitle_width) // 2
+        margin = self.config.margin
+        
+        if self.config.position == 'top':
+            y = margin
+        elif self.config.position == 'center':
+            y = (frame_height - subtitle_height) // 2
+        else:
+            y = frame_height - subtitle_height - margin
+        
+        x = max(0, min(x, frame_width - subtitle_width))
+        y = max(0, min(y, frame_height - subtitle_height))
+        return x, y
+    
+    def _blend_overlay(self, frame: np.ndarray, premultiplied: np.ndarray, inv_alpha: np.ndarray,
+                       x: int, y: int) -> np.ndarray:
+        subtitle_height, subtitle_width = premultiplied.shape[:2]
+        overlay_region = frame[y:y+subtitle_height, x:x+subtitle_width]
+        
+        # Slicing clips at the frame edge, so a shape match is the bounds check
+        if premultiplied.size and overlay_region.shape == premultiplied.shape:
+            self._blend_plane(overlay_region, premultiplied, inv_alpha)
+        
+        return frame
+    
+    def _blend_overlay_yuv(self, frame: np.ndarray, planes: List[Tuple[np.ndarray, np.ndarray]],
+                           x: int, y: int) -> np.ndarray:
+        """Blend into a yuv420p frame: Y at full resolution, U and V at half"""
+        frame_height, frame_width = frame.shape[0] * 2 // 3, frame.shape[1]
+        
+        for frame_plane, (premultiplied, inv_alpha), scale in zip(
+                _i420_planes(frame, frame_height, frame_width), planes, (1, 2, 2)):
+            plane_height, plane_width = premultiplied.shape
+            region = frame_plane[y // scale:y // scale + plane_height, x // scale:x // scale + plane_width]
+            if premultiplied.size and region.shape == premultiplied.shape:
+                self._blend_plane(region, premultiplied, inv_alpha)
         
         return frame
+    
+    def _blend_plane(self, region: np.ndarray, premultiplied: np.ndarray, inv_alpha: np.ndarray):
+        """In place: region = (region*(255-a) + premultiplied) / 255, with premultiplied = p*a + 128"""
+        if NUMBA_AVAILABLE:
+            if premultiplied.ndim == 2:
+                # Y/U/V planes: give the kernel a trailing single-channel axis
+                height, width = premultiplied.shape
+                region = region[:, :, np.newaxis]
+                premultiplied = premultiplied.reshape(height, width, 1)
+                inv_alpha = inv_alpha.reshape(height, width, 1)
+            _blend_plane_kernel(region, premultiplied, inv_alpha)
+            return
+        
+        size = premultiplied.size
+        self._reserve_blend_scratch(size)
+        scratch = self._blend_scratch[:size].reshape(premultiplied.shape)
+        out = self._blend_out[:size].reshape(premultiplied.shape)
+        
+        # OpenCV's SIMD-dispatched arithmetic; the +128 bias in premultiplied is
+        # removed by beta, and convertScaleAbs rounds and saturates back to uint8
+        cv2.multiply(region, inv_alpha, dst=scratch, dtype=cv2.CV_16U)
+        cv2.add(scratch, premultiplied, dst=scratch)
+        cv2.convertScaleAbs(scratch, dst=out, alpha=1 / 255.0, beta=-128 / 255.0)
+        np.copyto(region, out)
+    
+    def _reserve_blend_scratch(self, size: int):
+        """Grow the flat blend buffers to hold at least `size` elements"""
+        if self._blend_scratch.size < size:
+            self._blend_scratch = np.empty(size, dtype=np.uint16)
+            self._blend_out = np.empty(size, dtype=np.uint8)
+    
+    def _overlay_arrays(self, subtitle_img: Image.Image) -> Tuple[np.ndarray, np.ndarray, Tuple[int, int]]:
+        """uint16 premultiplied BGR (+128 rounding bias) and inverse alpha of the visible crop, plus its offset"""
+        entry = self._overlay_cache.get(id(subtitle_img))
+        if entry is None or entry[0] is not subtitle_img:
+            # Only the text's bounding box is blended; the transparent margins are dropped once here
+            rgba, offset = _crop_to_alpha(np.asarray(subtitle_img))
+            subtitle_bgr = rgba[:, :, 2::-1]  # RGB -> BGR view; also valid for an empty crop
+            alpha = rgba[:, :, 3:4].astype(np.uint16)
+            premultiplied = subtitle_bgr * alpha + 128
+            inv_alpha = 255 - alpha
+            if not NUMBA_AVAILABLE:
+                # cv2.multiply does not broadcast, so the OpenCV path needs all three channels
+                inv_alpha = np.ascontiguousarray(np.repeat(inv_alpha, 3, axis=2))
+            entry = self._overlay_cache[id(subtitle_img)] = (subtitle_img, premultiplied, inv_alpha, offset)
+        return entry[1], entry[2], entry[3]
+    
+    def _overlay_planes_yuv(self, subtitle_img: Image.Image,
+                            matrix: Tuple[float, float]) -> Tuple[List[Tuple[np.ndarray, np.ndarray]], Tuple[int, int]]:
+        """Per-plane (premultiplied + 128, inverse alpha) for Y, U, V of the visible crop, plus its offset;
+        chroma and chroma alpha are 2x2-averaged"""
+        cache_key = (id(subtitle_img), matrix)
+        entry = self._yuv_overlay_cache.get(cache_key)
+        if entry is None or entry[0] is not subtitle_img:
+            rgba = np.asarray(subtitle_img)
+            height, width = rgba.shape[:2]
+            if height % 2 or width % 2:
+                # I420 needs even dimensions; pad with transparent pixels
+                rgba = cv2.copyMakeBorder(rgba, 0, height % 2, 0, width % 2,
+                                          cv2.BORDER_CONSTANT, value=(0, 0, 0, 0))
+            
+            rgba, offset = _crop_to_alpha(rgba, even=True)
+            planes = []
+            if rgba.size:
+                height, width = rgba.shape[:2]
+                # cv2's RGB->I420 is fixed to BT.601, while HD sources are normally BT.709
+                luma, u, v = _rgb_to_yuv_limited(rgba, matrix)
+                chroma = [cv2.resize(plane, (width // 2, height // 2), interpolation=cv2.INTER_AREA)
+                          for plane in (u, v)]
+                alpha = rgba[:, :, 3]
+                chroma_alpha = cv2.resize(alpha, (width // 2, height // 2), interpolation=cv2.INTER_AREA)
+                
+                for plane, plane_alpha in zip([luma] + chroma, (alpha, chroma_alpha, chroma_alpha)):
+                    plane_alpha = plane_alpha.astype(np.uint16)
+                    planes.append((plane * plane_alpha + 128, 255 - plane_alpha))
+            entry = self._yuv_overlay_cache[cache_key] = (subtitle_img, planes, offset)
+        return entry[1], entry[2]
 
 
 def main():
@@ -951,6 +2147,12 @@ def main():
     parser.add_argument('--openai-model', default='gpt-4o-mini')
     parser.add_argument('--no-cache', action='store_true', 
                        help='Force fresh fetch (ignore cache but still save results)')
+    parser.add_argument('--llm', action='store_true',
+                       help='Analyze every line with OpenAI instead of local fugashi first')
+    parser.add_argument('--encoder', default='auto',
+                       help="ffmpeg video encoder: auto (h264_nvenc if available, else libx264) or an explicit name")
+    parser.add_argument('--backend', choices=['python', 'ffmpeg'], default='python',
+                       help="python = blend frames here; ffmpeg = overlay pre-rendered subtitle images in ffmpeg")
     
     # Auto-detect mode
     if len(sys.argv) == 1:
@@ -1007,6 +2209,9 @@ def main():
         main_font_size=args.main_font_size,
         furigana_font_size=args.furigana_font_size,
         openai_model=args.openai_model,
+        prefer_local_analysis=not args.llm,
+        ffmpeg_encoder=args.encoder,
+        burn_backend=args.backend,
         force_refresh=args.no_cache  # True = ignore cache, False = use cache
     )
     
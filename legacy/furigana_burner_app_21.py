@@ -19,8 +19,11 @@ import os
 import sys
 import glob
 import json
+import hashlib
+import functools
 import subprocess
 import shutil
+from collections import namedtuple
 from dataclasses import dataclass
 from typing import List, Tuple, Optional, Dict, Any
 from enum import Enum
@@ -35,6 +38,80 @@ try:
 except ImportError:
     KAKASI_AVAILABLE = False
 
+# Script class of every BMP code point; a string is classified with one NumPy gather
+CHAR_OTHER, CHAR_HIRAGANA, CHAR_KATAKANA, CHAR_KANJI = 0, 1, 2, 3
+CHAR_CLASS = np.zeros(0x10000, dtype=np.uint8)
+CHAR_CLASS[0x3040:0x30A0] = CHAR_HIRAGANA
+CHAR_CLASS[0x30A0:0x3100] = CHAR_KATAKANA
+CHAR_CLASS[0x4E00:0x9FB0] = CHAR_KANJI
+JAPANESE_PUNCTUATION = np.array([ord(c) for c in '、。！？'], dtype=np.uint32)
+
+# Single-character checks: hashed set membership instead of two comparisons
+HIRAGANA_CHARS = frozenset(map(chr, range(0x3040, 0x30A0)))
+KATAKANA_CHARS = frozenset(map(chr, range(0x30A0, 0x3100)))
+KANJI_RANGE = ('\u4e00', '\u9faf')
+
+# ァ..ヶ map onto ぁ..ゖ; marks like ー and ・ have no hiragana form and are kept
+KATA_TO_HIRA_TABLE = str.maketrans({chr(c): chr(c - 0x60) for c in range(0x30A1, 0x30F7)})
+
+# Subtitle file encodings, tried in order; utf-8-sig also drops a leading BOM
+SUBTITLE_ENCODINGS = ('utf-8-sig', 'shift_jis', 'euc-jp', 'cp932')
+
+# Timestamp pattern, compiled once
+_TS_RE = re.compile(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})')
+
+# One SRT cue: at the start of the file or after a blank line, an index line,
+# the timing line, then text up to the next blank line
+_SRT_BLOCK_RE = re.compile(
+    r'(?:\A|\n\s*\n)\s*\S[^\n]*\n'
+    r'(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}),(\d{3})[^\n]*'
+    r'(.*?)(?=\n\s*\n|\Z)',
+    re.DOTALL)
+
+
+# Structure-of-arrays view of a string: one boolean mask per script class
+_Classified = namedtuple('_Classified', 'hira kata kanji punct')
+
+
+def _classify(text: str) -> _Classified:
+    """Per-character boolean masks: hira, kata, kanji and punct (、。！？)"""
+    codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    classes = CHAR_CLASS[np.minimum(codes, 0xFFFF)]
+    return _Classified(
+        hira=classes == CHAR_HIRAGANA,
+        kata=classes == CHAR_KATAKANA,
+        kanji=classes == CHAR_KANJI,
+        punct=np.isin(codes, JAPANESE_PUNCTUATION),
+    )
+
+
+# Pure predicates over whole strings; captions and particles (は, を, の) repeat
+# constantly, so results are memoized by text
+
+@functools.lru_cache(maxsize=4096)
+def _contains_japanese(text: str) -> bool:
+    """Check if text contains Japanese characters (hiragana, katakana, or kanji)"""
+    classes = _classify(text)
+    return bool((classes.hira | classes.kata | classes.kanji).any())
+
+
+@functools.lru_cache(maxsize=4096)
+def _contains_chinese(text: str) -> bool:
+    """Check if text contains Chinese characters"""
+    # Kanji and Chinese characters overlap significantly
+    return bool(_classify(text).kanji.any())
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_all_hiragana(text: str) -> bool:
+    classes = _classify(text)
+    return bool((classes.hira | classes.punct).all())
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_all_katakana(text: str) -> bool:
+    return bool(_classify(text).kata.all())
+
 
 class GrammaticalType(Enum):
     """Grammatical types for Japanese components"""
@@ -105,6 +182,12 @@ class GrammaticalWord:
     color: Tuple[int, int, int]
 
 
+# Non-Japanese text is drawn in white; words are only read after creation, so
+# every space between words can share one instance
+SIMPLE_WORD_COLOR = (255, 255, 255)
+SIMPLE_SPACE_WORD = GrammaticalWord(" ", None, GrammaticalType.OTHER, SIMPLE_WORD_COLOR)
+
+
 @dataclass
 class SubtitleSegment:
     start_time: float
@@ -199,6 +282,14 @@ class GrammaticalColorScheme:
         return cls.COLOR_MAP.get(grammatical_type, cls.COLOR_MAP[GrammaticalType.OTHER])
 
 
+# Type and color by enum position, so a response's type string resolves with one
+# str-keyed dict hit plus tuple indexing (no Enum construction or Enum hashing)
+GRAMMATICAL_TYPES = tuple(GrammaticalType)
+TYPE_INDEX_BY_STR = {grammatical_type.value: index for index, grammatical_type in enumerate(GRAMMATICAL_TYPES)}
+COLOR_BY_TYPE_INDEX = tuple(GrammaticalColorScheme.get_color(grammatical_type) for grammatical_type in GRAMMATICAL_TYPES)
+OTHER_TYPE_INDEX = TYPE_INDEX_BY_STR[GrammaticalType.OTHER.value]
+
+
 class FuriganaGrammaticalAnalyzer:
     """Furigana grammatical analyzer with conservative suffix-based post-processing"""
     
@@ -267,7 +358,7 @@ class FuriganaGrammaticalAnalyzer:
             return []
         
         # Check if text contains Japanese characters
-        has_japanese = self._contains_japanese(text)
+        has_japanese = _contains_japanese(text)
         
         # If no Japanese characters or explicitly marked as non-Japanese, use simple fallback
         # NO AI for non-Japanese languages
@@ -289,23 +380,19 @@ Break into words with:
 
 CRITICAL: Provide complete, accurate furigana for the entire word. """
 
-            # Handle force refresh: if force_refresh=True, use timestamp to fetch new data
-            # but still cache the result. If force_refresh=False, use existing cache.
-            if self.config.force_refresh:
-                # Use timestamp to force fresh request but still cache result
-                import time
-                cache_key = f"furigana_{abs(hash(text))}_{int(time.time())}.json"
-            else:
-                # Normal cache filename - will use existing cache if available
-                cache_key = f"furigana_{abs(hash(text))}.json"
+            # Stable across runs (built-in hash() is salted per process), so a
+            # second run of the same video reuses the first run's responses
+            text_digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+            cache_key = f"furigana_{text_digest}.json"
             
-            # Single request call
+            # Single request call; force refresh skips the lookup but overwrites the entry
             result = self.openai_client.send_request_with_json_schema(
                 prompt=prompt,
                 json_schema=self.analysis_schema,
                 filename=cache_key,
                 schema_name="furigana_analysis",
-                model=self.config.openai_model
+                model=self.config.openai_model,
+                bypass_cache=self.config.force_refresh
             )
             
             if result and 'words' in result:
@@ -317,20 +404,6 @@ CRITICAL: Provide complete, accurate furigana for the entire word. """
             print(f"⚠️ Analysis error: {e}")
             return self._create_simple_words(text)
     
-    def _contains_japanese(self, text: str) -> bool:
-        """Check if text contains Japanese characters (hiragana, katakana, or kanji)"""
-        for char in text:
-            if (self._is_hiragana(char) or self._is_katakana(char) or self._is_kanji(char)):
-                return True
-        return False
-    
-    def _contains_chinese(self, text: str) -> bool:
-        """Check if text contains Chinese characters"""
-        for char in text:
-            if self._is_kanji(char):  # Kanji and Chinese characters overlap significantly
-                return True
-        return False
-    
     def _process_furigana_result(self, words_data: List[Dict]) -> List[GrammaticalWord]:
         """Process result with conservative suffix-based post-processing"""
         
@@ -344,14 +417,10 @@ CRITICAL: Provide complete, accurate furigana for the entire word. """
             if not word:
                 continue
             
-            # Convert to enum
-            try:
-                grammatical_type = GrammaticalType(type_str)
-            except ValueError:
-                grammatical_type = GrammaticalType.OTHER
-            
-            # Get color
-            color = GrammaticalColorScheme.get_color(grammatical_type)
+            # Convert to enum and color (unknown types fall back to OTHER)
+            type_index = TYPE_INDEX_BY_STR.get(type_str, OTHER_TYPE_INDEX)
+            grammatical_type = GRAMMATICAL_TYPES[type_index]
+            color = COLOR_BY_TYPE_INDEX[type_index]
             
             # FURIGANA POST-PROCESSING: Conservative suffix-based approach
             processed_parts = self._furigana_post_process(word, furigana, grammatical_type, color)
@@ -371,24 +440,27 @@ CRITICAL: Provide complete, accurate furigana for the entire word. """
             return [GrammaticalWord(word=word, furigana=None, grammatical_type=grammatical_type, color=color)]
         
         # Rule 1: Simple cleanup first
-        if self._is_all_hiragana(word) and word == furigana:
+        if _is_all_hiragana(word) and word == furigana:
             return [GrammaticalWord(word=word, furigana=None, grammatical_type=grammatical_type, color=color)]
         
-        if self._is_all_katakana(word) and self._katakana_to_hiragana(word) == furigana:
+        if _is_all_katakana(word) and self._katakana_to_hiragana(word) == furigana:
             return [GrammaticalWord(word=word, furigana=None, grammatical_type=grammatical_type, color=color)]
         
+        # One classification pass shared by the remaining rules
+        classes = _classify(word)
+        
         # Rule 2: Handle お茶 pattern (hiragana prefix + kanji)
-        if self._has_hiragana_prefix(word):
-            return self._handle_prefix_pattern(word, furigana, grammatical_type, color)
+        if self._has_hiragana_prefix(word, classes):
+            return self._handle_prefix_pattern(word, furigana, grammatical_type, color, classes)
         
         # Rule 3: Handle suffix pattern (kanji + hiragana ending)
-        if self._has_hiragana_suffix(word):
-            return self._handle_suffix_pattern(word, furigana, grammatical_type, color)
+        if self._has_hiragana_suffix(word, classes):
+            return self._handle_suffix_pattern(word, furigana, grammatical_type, color, classes)
         
         # Rule 4: For complex mixed patterns, be conservative
-        if self._is_complex_mixed(word):
+        if self._is_complex_mixed(word, classes):
             # Try suffix approach first, if it doesn't work well, keep original
-            suffix_result = self._try_suffix_approach(word, furigana, grammatical_type, color)
+            suffix_result = self._try_suffix_approach(word, furigana, grammatical_type, color, classes)
             if len(suffix_result) == 2 and suffix_result[0].furigana:  # Good split
                 return suffix_result
         
@@ -400,47 +472,40 @@ CRITICAL: Provide complete, accurate furigana for the entire word. """
             color=color
         )]
     
-    def _has_hiragana_prefix(self, word: str) -> bool:
+    def _has_hiragana_prefix(self, word: str, classes: Optional[_Classified] = None) -> bool:
         """Check for お茶 pattern: starts with hiragana, has kanji"""
         if len(word) < 2:
             return False
-        return (self._is_hiragana(word[0]) and 
-                any(self._is_kanji(c) for c in word[1:]))
+        classes = classes if classes is not None else _classify(word)
+        return bool(classes.hira[0] and classes.kanji[1:].any())
     
-    def _has_hiragana_suffix(self, word: str) -> bool:
+    def _has_hiragana_suffix(self, word: str, classes: Optional[_Classified] = None) -> bool:
         """Check for 聞こえて pattern: has kanji, ends with hiragana"""
         if len(word) < 2:
             return False
-        return (any(self._is_kanji(c) for c in word) and 
-                self._is_hiragana(word[-1]))
+        classes = classes if classes is not None else _classify(word)
+        return bool(classes.kanji.any() and classes.hira[-1])
     
-    def _is_complex_mixed(self, word: str) -> bool:
+    def _is_complex_mixed(self, word: str, classes: Optional[_Classified] = None) -> bool:
         """Check for complex patterns with multiple kanji-hiragana transitions"""
         if len(word) < 3:
             return False
         
-        transitions = 0
-        prev_was_kanji = False
-        
-        for char in word:
-            is_kanji = self._is_kanji(char)
-            if is_kanji != prev_was_kanji:
-                transitions += 1
-            prev_was_kanji = is_kanji
+        classes = classes if classes is not None else _classify(word)
+        # Transitions into and out of kanji runs, counting a leading kanji as one
+        transitions = np.count_nonzero(np.diff(classes.kanji, prepend=False))
         
         return transitions >= 3  # Multiple transitions indicate complexity
     
     def _handle_prefix_pattern(self, word: str, furigana: str, 
                               grammatical_type: GrammaticalType, 
-                              color: Tuple[int, int, int]) -> List[GrammaticalWord]:
+                              color: Tuple[int, int, int],
+                              classes: Optional[_Classified] = None) -> List[GrammaticalWord]:
         """Handle お茶 → お + 茶(ちゃ) pattern"""
         
         # Find where kanji starts
-        kanji_start = -1
-        for i, char in enumerate(word):
-            if self._is_kanji(char):
-                kanji_start = i
-                break
+        classes = classes if classes is not None else _classify(word)
+        kanji_start = int(classes.kanji.argmax()) if classes.kanji.any() else -1
         
         if kanji_start > 0:
             prefix_part = word[:kanji_start]
@@ -477,23 +542,22 @@ CRITICAL: Provide complete, accurate furigana for the entire word. """
     
     def _handle_suffix_pattern(self, word: str, furigana: str, 
                              grammatical_type: GrammaticalType, 
-                             color: Tuple[int, int, int]) -> List[GrammaticalWord]:
+                             color: Tuple[int, int, int],
+                             classes: Optional[_Classified] = None) -> List[GrammaticalWord]:
         """Handle 聞こえて → 聞(き) + こえて pattern"""
         
-        return self._try_suffix_approach(word, furigana, grammatical_type, color)
+        return self._try_suffix_approach(word, furigana, grammatical_type, color, classes)
     
     def _try_suffix_approach(self, word: str, furigana: str, 
                            grammatical_type: GrammaticalType, 
-                           color: Tuple[int, int, int]) -> List[GrammaticalWord]:
+                           color: Tuple[int, int, int],
+                           classes: Optional[_Classified] = None) -> List[GrammaticalWord]:
         """Try suffix-based splitting approach"""
         
-        # Find the longest hiragana suffix
-        suffix_start = len(word)
-        for i in range(len(word) - 1, -1, -1):
-            if self._is_hiragana(word[i]):
-                suffix_start = i
-            else:
-                break
+        # The longest hiragana suffix starts right after the last non-hiragana character
+        classes = classes if classes is not None else _classify(word)
+        non_hiragana = np.flatnonzero(~classes.hira)
+        suffix_start = int(non_hiragana[-1]) + 1 if non_hiragana.size else 0
         
         if suffix_start < len(word) and suffix_start > 0:
             # We have a hiragana suffix
@@ -527,29 +591,17 @@ CRITICAL: Provide complete, accurate furigana for the entire word. """
         # If suffix approach doesn't work, return original
         return [GrammaticalWord(word=word, furigana=furigana, grammatical_type=grammatical_type, color=color)]
     
-    def _is_all_hiragana(self, text: str) -> bool:
-        return all(self._is_hiragana(c) or c in '、。！？' for c in text)
-    
-    def _is_all_katakana(self, text: str) -> bool:
-        return all(self._is_katakana(c) for c in text)
-    
     def _is_hiragana(self, char: str) -> bool:
-        return '\u3040' <= char <= '\u309f'
+        return char in HIRAGANA_CHARS
     
     def _is_katakana(self, char: str) -> bool:
-        return '\u30a0' <= char <= '\u30ff'
+        return char in KATAKANA_CHARS
     
     def _is_kanji(self, char: str) -> bool:
-        return '\u4e00' <= char <= '\u9faf'
+        return KANJI_RANGE[0] <= char <= KANJI_RANGE[1]
     
     def _katakana_to_hiragana(self, katakana_text: str) -> str:
-        result = ""
-        for char in katakana_text:
-            if self._is_katakana(char):
-                result += chr(ord(char) - 0x60)
-            else:
-                result += char
-        return result
+        return katakana_text.translate(KATA_TO_HIRA_TABLE)
     
     def _create_simple_words(self, text: str) -> List[GrammaticalWord]:
         """Create simple words for non-Japanese text with proper wrapping"""
@@ -559,42 +611,21 @@ CRITICAL: Provide complete, accurate furigana for the entire word. """
             return []
         
         # Check if text contains Chinese characters (no spaces between words)
-        has_chinese = self._contains_chinese(normalized_text)
+        has_chinese = _contains_chinese(normalized_text)
         
-        result = []
+        other = GrammaticalType.OTHER
         
         if has_chinese:
             # For Chinese text, split into individual characters for basic wrapping
             # This is a simple approach - proper Chinese word segmentation would require additional libraries
-            for i, char in enumerate(normalized_text):
-                if char.strip():  # Skip whitespace characters
-                    result.append(GrammaticalWord(
-                        word=char,
-                        furigana=None,
-                        grammatical_type=GrammaticalType.OTHER,
-                        color=(255, 255, 255)  # White for non-Japanese text
-                    ))
-        else:
-            # For space-separated languages (English, etc.), split on spaces
-            words = normalized_text.split()
-            
-            for i, word in enumerate(words):
-                # Add space before word (except for first word)
-                if i > 0:
-                    result.append(GrammaticalWord(
-                        word=" ",
-                        furigana=None,
-                        grammatical_type=GrammaticalType.OTHER,
-                        color=(255, 255, 255)
-                    ))
-                
-                result.append(GrammaticalWord(
-                    word=word,
-                    furigana=None,
-                    grammatical_type=GrammaticalType.OTHER,
-                    color=(255, 255, 255)  # White for non-Japanese text
-                ))
-        
+            return [GrammaticalWord(char, None, other, SIMPLE_WORD_COLOR)
+                    for char in normalized_text if not char.isspace()]
+        
+        # For space-separated languages (English, etc.), split on spaces and
+        # put the shared space word between consecutive words
+        words = normalized_text.split()
+        result = [SIMPLE_SPACE_WORD] * (2 * len(words) - 1)
+        result[::2] = [GrammaticalWord(word, None, other, SIMPLE_WORD_COLOR) for word in words]
         return result
 
 
@@ -603,22 +634,25 @@ class SubtitleParser:
     
     @staticmethod
     def parse_subtitles(file_path: str) -> List[SubtitleSegment]:
-        encodings = ['utf-8', 'utf-8-sig', 'shift_jis', 'euc-jp', 'cp932']
+        try:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        except OSError as e:
+            print(f"❌ Could not read file: {file_path} ({e})")
+            return []
         
-        for encoding in encodings:
+        # Decode the in-memory bytes instead of re-reading the file per encoding
+        for encoding in SUBTITLE_ENCODINGS:
             try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read().strip()
-                
-                if file_path.lower().endswith('.json') or content.startswith('['):
-                    return SubtitleParser.parse_json_content(content)
-                else:
-                    return SubtitleParser.parse_srt_content(content)
-                    
+                # Bytes skip open()'s universal newlines, so CRLF/CR are folded here
+                content = raw.decode(encoding).replace('\r\n', '\n').replace('\r', '\n').strip()
             except UnicodeDecodeError:
                 continue
-            except Exception as e:
-                continue
+            
+            if file_path.lower().endswith('.json') or content.startswith('['):
+                return SubtitleParser.parse_json_content(content)
+            else:
+                return SubtitleParser.parse_srt_content(content)
         
         print(f"❌ Could not decode file: {file_path}")
         return []
@@ -657,32 +691,14 @@ class SubtitleParser:
     @staticmethod
     def parse_srt_content(content: str) -> List[SubtitleSegment]:
         segments = []
-        blocks = re.split(r'\n\s*\n', content.strip())
         
-        for block in blocks:
-            try:
-                lines = block.strip().split('\n')
-                if len(lines) < 3:
-                    continue
-                
-                timestamp_line = lines[1]
-                match = re.match(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}),(\d{3})', 
-                               timestamp_line)
-                
-                if not match:
-                    continue
-                
-                start_time = (int(match.group(1)) * 3600 + int(match.group(2)) * 60 + 
-                             int(match.group(3)) + int(match.group(4)) / 1000)
-                end_time = (int(match.group(5)) * 3600 + int(match.group(6)) * 60 + 
-                           int(match.group(7)) + int(match.group(8)) / 1000)
-                
-                text = ' '.join(lines[2:]).strip()
-                if text:
-                    segments.append(SubtitleSegment(start_time, end_time, text))
-                    
-            except Exception:
-                continue
+        # A single scan over the file; cues without a timing line never match
+        for match in _SRT_BLOCK_RE.finditer(content.strip()):
+            h1, m1, s1, ms1, h2, m2, s2, ms2 = map(int, match.group(1, 2, 3, 4, 5, 6, 7, 8))
+            text = match.group(9).replace('\n', ' ').strip()
+            if text:
+                segments.append(SubtitleSegment(h1 * 3600 + m1 * 60 + s1 + ms1 / 1000,
+                                                h2 * 3600 + m2 * 60 + s2 + ms2 / 1000, text))
         
         print(f"📝 Parsed {len(segments)} SRT segments")
         return segments
@@ -691,7 +707,7 @@ class SubtitleParser:
     def _parse_timestamp(timestamp_str: str) -> Optional[float]:
         try:
             if ',' in timestamp_str:
-                match = re.match(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})', timestamp_str)
+                match = _TS_RE.match(timestamp_str)
                 if match:
                     return (int(match.group(1)) * 3600 + int(match.group(2)) * 60 + 
                            int(match.group(3)) + int(match.group(4)) / 1000)
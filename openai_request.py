@@ -241,7 +241,7 @@ class OpenAIRequestJSONBase:
         except Exception as e:
             print(f"Error stopping audio: {e}")
 
-    def send_request_with_json_schema(self, prompt, json_schema, system_content="You are an AI.", filename=None, schema_name="response", model=None):
+    def send_request_with_json_schema(self, prompt, json_schema, system_content="You are an AI.", filename=None, schema_name="response", model=None, bypass_cache=False):
         """
         Send a request to OpenAI with structured JSON schema validation.
         
@@ -251,6 +251,7 @@ class OpenAIRequestJSONBase:
             system_content: System message content
             filename: Optional cache filename
             schema_name: Name for the JSON schema
+            bypass_cache: Skip the cache lookup but still store the fresh response
         
         Returns:
             Parsed JSON response that conforms to the schema
@@ -266,7 +267,7 @@ class OpenAIRequestJSONBase:
 
         print("self.use_cache: ", self.use_cache)
 
-        if self.use_cache:
+        if self.use_cache and not bypass_cache:
             cached_response = self.load_from_cache(prompt, filename=filename)
             if cached_response:
                 print("OpenAI cache found. ")